@@ -1,28 +1,92 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_restful import Api
-from models import db
-from resources import WorkshopListResource, WorkshopResource, WorkshopRegistration
+from cache import create_cache
+from config import apply_storage_profile, storage_config
+from jobs import create_broker
+from metrics import Metrics
+from models import db, ensure_catalog_version, recount_enrolled
+from migrations import upgrade
+from responses import Compress, JSONProvider, dumps
+from search import install_search
+from resources import (
+    CacheStatsResource,
+    WorkshopBatchResource,
+    WorkshopSearchResource,
+    WorkshopUpcomingResource,
+    WorkshopBulkResource,
+    WorkshopExportResource,
+    WorkshopListResource,
+    WorkshopRegistration,
+    WorkshopResource,
+)
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///workshops.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-CORS(app)
-api = Api(app)
 
-db.init_app(app)
+def create_app(database_uri=None, config=None, storage_profile=None):
+    app = Flask(__name__)
+    app.config.update(storage_config(database_uri, storage_profile))
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Read-through cache: 'memory' (per-process LRU), 'redis' or 'none'
+    app.config['CACHE_BACKEND'] = 'memory'
+    app.config['CACHE_MAXSIZE'] = 1024
+    app.config['CACHE_TTL'] = 60
+    # Background jobs: 'sql' (job table, drained by worker.py) or 'memory'
+    app.config['JOB_BROKER'] = 'sql'
+    # Log requests slower than this many milliseconds with their SQL (None: off)
+    app.config['METRICS_SLOW_REQUEST_MS'] = None
+    # gzip/brotli-encode JSON bodies from this many bytes on (None: off)
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    app.config.update(config or {})
+    CORS(app)
+    app.json = JSONProvider(app)
+    api = Api(app)
 
-# Initialize DB
-with app.app_context():
-    db.create_all()
+    @api.representation('application/json')
+    def output_json(data, code, headers=None):
+        # Compact bytes (orjson when installed) instead of flask-restful's json.dumps
+        return app.response_class(dumps(data), status=code, headers=headers, mimetype='application/json')
 
-@app.route('/')
-def home():
-    return jsonify({"message": "Backend is running!"})
+    db.init_app(app)
+    app.extensions['workshop_cache'] = create_cache(app.config)
+    app.extensions['job_broker'] = create_broker(app.config)
+
+    # Initialize DB
+    with app.app_context():
+        apply_storage_profile(db.engine, app.config['STORAGE_PROFILE'])
+        recount = upgrade(db.engine)
+        db.create_all()
+        install_search(db.engine)
+        ensure_catalog_version()
+        if recount:
+            recount_enrolled()
+        metrics = Metrics(app, engine=db.engine, slow_request_ms=app.config['METRICS_SLOW_REQUEST_MS'])
+
+    # after_request hooks run last-registered first: compress before the
+    # metrics hook records the response size
+    if app.config['COMPRESS_MIN_SIZE'] is not None:
+        Compress(app, minimum_size=app.config['COMPRESS_MIN_SIZE'])
+
+    cache = app.extensions['workshop_cache']
+    for stat in ('hits', 'misses', 'evictions'):
+        metrics.add_callback(f'workshop_cache_{stat}_total', f'Read-through cache {stat}.',
+                             lambda stat=stat: cache.stats()[stat], kind='counter')
+
+    @app.route('/')
+    def home():
+        return jsonify({"message": "Backend is running!"})
+
+    api.add_resource(WorkshopListResource, '/workshops')
+    api.add_resource(WorkshopResource, '/workshops/<int:workshop_id>')
+    api.add_resource(WorkshopRegistration, '/workshops/<int:workshop_id>/register')
+    api.add_resource(WorkshopBulkResource, '/workshops/bulk')
+    api.add_resource(WorkshopBatchResource, '/workshops/batch')
+    api.add_resource(WorkshopExportResource, '/workshops/export')
+    api.add_resource(WorkshopSearchResource, '/workshops/search')
+    api.add_resource(WorkshopUpcomingResource, '/workshops/upcoming')
+    api.add_resource(CacheStatsResource, '/cache/stats')
+
+    return app
 
-api.add_resource(WorkshopListResource, '/workshops')
-api.add_resource(WorkshopResource, '/workshops/<int:workshop_id>')
-api.add_resource(WorkshopRegistration, '/workshops/<int:workshop_id>/register')
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for CACHE_BACKEND=redis
+    redis = None
+
+
+class LRUCache:
+    """In-process cache bounded by entry count, with a per-entry time to live."""
+
+    backend = 'memory'
+
+    def __init__(self, maxsize=1024, ttl=60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class RedisCache:
+    """Cache shared between processes through a Redis-compatible server (Redis, KeyDB)."""
+
+    backend = 'redis'
+
+    def __init__(self, client, ttl=60, prefix='workshops:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=self.ttl)
+
+    def delete_prefix(self, prefix):
+        keys = list(self.client.scan_iter(match=self.prefix + prefix + '*', count=500))
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        self.delete_prefix('')
+
+    def stats(self):
+        # Evictions happen inside the server, report its own counter
+        evictions = self.client.info('stats').get('evicted_keys', 0)
+        return {
+            'backend': self.backend,
+            'size': None,
+            'maxsize': None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': evictions
+        }
+
+
+class NullCache:
+    backend = 'none'
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete_prefix(self, prefix):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': self.backend, 'size': 0, 'maxsize': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def create_cache(config):
+    backend = config.get('CACHE_BACKEND', 'memory')
+    ttl = config.get('CACHE_TTL', 60)
+    if backend == 'memory':
+        return LRUCache(maxsize=config.get('CACHE_MAXSIZE', 1024), ttl=ttl)
+    if backend == 'redis':
+        if redis is None:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package (pip install redis)')
+        client = redis.Redis.from_url(config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+        return RedisCache(client, ttl=ttl)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+
+
+def get_cache():
+    return current_app.extensions['workshop_cache']
+
+
+# Keys embed the catalog version (lists) or the row's updated_at (items), so
+# a stale entry can never be served even by another process's memory cache;
+# the explicit invalidation below frees the superseded entries right away.
+def list_key(version, query):
+    return f'list:{version}:{query}'
+
+
+def workshop_key(workshop_id, updated_at):
+    return f'workshop:{workshop_id}:{updated_at.isoformat()}'
+
+
+def invalidate_workshops(workshop_id=None):
+    cache = get_cache()
+    cache.delete_prefix('list:')
+    if workshop_id is not None:
+        cache.delete_prefix(f'workshop:{workshop_id}:')
@@ -0,0 +1,44 @@
+import hashlib
+from datetime import timezone
+
+from flask import Response, request
+from werkzeug.http import http_date
+
+
+def canonical_query():
+    return '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+
+
+def list_etag(version):
+    # The same catalog version and query string always render the same bytes
+    digest = hashlib.sha1(f'{version}?{canonical_query()}'.encode('utf-8')).hexdigest()
+    return f'catalog-{digest[:20]}'
+
+
+def item_etag(workshop_id, updated_at):
+    return f'workshop-{workshop_id}-{updated_at.strftime("%Y%m%d%H%M%S%f")}'
+
+
+def validator_headers(etag, last_modified):
+    return {
+        'ETag': f'"{etag}"',
+        'Last-Modified': http_date(last_modified.replace(tzinfo=timezone.utc)),
+        # Let browsers keep the copy but revalidate it on every poll
+        'Cache-Control': 'no-cache'
+    }
+
+
+def not_modified(etag, last_modified):
+    """Return a 304 response when the client's copy is still current, else None."""
+    if request.if_none_match:
+        # Weak comparison: compressed responses carry the weak form W/"..."
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since:
+        modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        fresh = modified <= request.if_modified_since
+    else:
+        fresh = False
+
+    if not fresh:
+        return None
+    return Response(status=304, headers=validator_headers(etag, last_modified))
@@ -0,0 +1,69 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URL = 'sqlite:///workshops.db'
+
+# PRAGMAs applied to every new SQLite connection, per storage profile.
+# 'compat' keeps SQLite's own defaults (rollback journal, full fsync per
+# commit); 'production' switches to WAL so readers never block the writer,
+# fsyncs only at checkpoints and waits for locks instead of failing with
+# "database is locked".
+STORAGE_PROFILES = {
+    'compat': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -20000,
+        'temp_store': 'MEMORY',
+    },
+}
+
+POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+}
+
+
+def storage_config(database_uri=None, profile=None):
+    """Build the SQLAlchemy settings for create_app from arguments or the environment.
+
+    DATABASE_URL selects the database (any SQLAlchemy URL, e.g. a PostgreSQL
+    server) and STORAGE_PROFILE the SQLite tuning profile.
+    """
+    database_uri = database_uri or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    profile = profile or os.environ.get('STORAGE_PROFILE', 'production')
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f'Unknown STORAGE_PROFILE {profile!r}, expected one of {sorted(STORAGE_PROFILES)}')
+
+    url = make_url(database_uri)
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+    engine_options = {}
+    if not in_memory:
+        # In-memory SQLite lives on a single shared connection, so no pool tuning
+        engine_options.update(POOL_OPTIONS)
+    if url.get_backend_name() != 'sqlite':
+        engine_options.update(pool_pre_ping=True, pool_recycle=1800)
+
+    return {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options,
+        'STORAGE_PROFILE': profile,
+    }
+
+
+def apply_storage_profile(engine, profile):
+    pragmas = STORAGE_PROFILES[profile]
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
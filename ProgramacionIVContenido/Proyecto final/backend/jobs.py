@@ -0,0 +1,241 @@
+"""Background jobs for work that does not have to finish inside the request.
+
+Request handlers only call enqueue(); a worker (worker.py) claims the jobs
+later and runs the handler registered for their kind. Two brokers share the
+same interface:
+
+- SQLBroker (JOB_BROKER='sql', default) stores jobs in the `job` table of the
+  application database. The row is written in the request's own transaction,
+  so a job exists exactly when the change it describes was committed.
+- MemoryBroker (JOB_BROKER='memory') keeps them in a process-local queue and
+  only publishes them after the session commits. Meant for tests and for
+  running the worker in the same process.
+
+Delivery is at least once: a job whose worker dies is claimed again when its
+lease expires, so handlers must be idempotent.
+"""
+import itertools
+import json
+import logging
+import queue
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import AuditEntry, Job, Registration, Workshop, db, purge_deleted_workshops
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+LEASE = timedelta(minutes=5)
+# Pause between purge batches so request writes can take the lock in between
+PURGE_PAUSE = 0.01
+
+
+def retry_delay(attempts):
+    # 2, 4, 8, 16... seconds
+    return timedelta(seconds=2 ** attempts)
+
+
+class SQLBroker:
+    backend = 'sql'
+
+    def put(self, kind, payload):
+        db.session.add(Job(kind=kind, payload=json.dumps(payload)))
+
+    def claim(self, limit):
+        now = datetime.utcnow()
+        candidates = db.session.execute(
+            select(Job.id)
+            .where(or_(Job.status == 'pending', Job.status == 'running'), Job.available_at <= now)
+            .order_by(Job.id)
+            .limit(limit)
+        ).scalars().all()
+
+        # Conditional UPDATE per job so two workers never take the same one;
+        # a 'running' job past its lease belonged to a worker that died
+        claimed = []
+        for job_id in candidates:
+            taken = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status != 'failed', Job.available_at <= now)
+                .values(status='running', attempts=Job.attempts + 1, available_at=now + LEASE)
+            )
+            if taken.rowcount:
+                claimed.append(job_id)
+        db.session.commit()
+        if not claimed:
+            return []
+        return db.session.execute(
+            select(Job).where(Job.id.in_(claimed)).order_by(Job.id)
+        ).scalars().all()
+
+    def complete(self, job):
+        db.session.execute(Job.__table__.delete().where(Job.id == job.id))
+        db.session.commit()
+
+    def fail(self, job, error):
+        values = {'last_error': error}
+        if job.attempts >= MAX_ATTEMPTS:
+            values['status'] = 'failed'
+        else:
+            values.update(status='pending', available_at=datetime.utcnow() + retry_delay(job.attempts))
+        db.session.execute(update(Job).where(Job.id == job.id).values(**values))
+        db.session.commit()
+
+    def stats(self):
+        counts = dict(db.session.execute(
+            select(Job.status, db.func.count(Job.id)).group_by(Job.status)
+        ).all())
+        return {
+            'backend': self.backend,
+            **{status: counts.get(status, 0) for status in ('pending', 'running', 'failed')}
+        }
+
+
+class QueuedJob:
+    def __init__(self, job_id, kind, payload):
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = 0
+        self.last_error = None
+
+
+class MemoryBroker:
+    backend = 'memory'
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self.failed = []
+
+    def put(self, kind, payload):
+        job = QueuedJob(next(self._ids), kind, json.dumps(payload))
+        db.session.info.setdefault('pending_jobs', []).append((self, job))
+
+    def publish(self, job):
+        self._queue.put(job)
+
+    def claim(self, limit):
+        jobs = []
+        while len(jobs) < limit:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            job.attempts += 1
+            jobs.append(job)
+        return jobs
+
+    def complete(self, job):
+        pass
+
+    def fail(self, job, error):
+        job.last_error = error
+        # No delayed delivery here: retries go straight back to the queue
+        if job.attempts >= MAX_ATTEMPTS:
+            self.failed.append(job)
+        else:
+            self._queue.put(job)
+
+    def stats(self):
+        return {'backend': self.backend, 'pending': self._queue.qsize(), 'running': 0, 'failed': len(self.failed)}
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending_jobs(session):
+    for broker, job in session.info.pop('pending_jobs', ()):
+        broker.publish(job)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_jobs(session, previous_transaction):
+    session.info.pop('pending_jobs', None)
+
+
+def create_broker(config):
+    backend = config.get('JOB_BROKER', 'sql')
+    if backend == 'sql':
+        return SQLBroker()
+    if backend == 'memory':
+        return MemoryBroker()
+    raise ValueError(f'Unknown JOB_BROKER {backend!r}')
+
+
+def get_broker():
+    return current_app.extensions['job_broker']
+
+
+def enqueue(kind, **payload):
+    """Queue a job as part of the current transaction; it runs only if that transaction commits."""
+    get_broker().put(kind, payload)
+
+
+HANDLERS = {}
+
+
+def handles(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def run_jobs(limit=50):
+    """Claim up to `limit` jobs and run them; returns how many were claimed."""
+    broker = get_broker()
+    jobs = broker.claim(limit)
+    for job in jobs:
+        try:
+            handler = HANDLERS[job.kind]
+            handler(json.loads(job.payload))
+        except Exception as e:
+            db.session.rollback()
+            logger.exception('Job %s (%s) failed on attempt %s', job.id, job.kind, job.attempts)
+            broker.fail(job, f'{type(e).__name__}: {e}')
+        else:
+            broker.complete(job)
+    return len(jobs)
+
+
+def default_notifier(student, workshop):
+    logger.info('Registration confirmed: %s <%s> in "%s" on %s',
+                student.name, student.email, workshop.name, workshop.starts_at.isoformat())
+
+
+@handles('registration.notify')
+def notify_registration(payload):
+    registration = db.session.get(Registration, payload['registration_id'])
+    workshop = db.session.get(Workshop, payload['workshop_id'])
+    if registration is None or workshop is None or workshop.deleted_at is not None:
+        # Cancelled before the worker got to it: nothing to confirm
+        return
+    notifier = current_app.config.get('REGISTRATION_NOTIFIER') or default_notifier
+    notifier(registration.student, workshop)
+
+
+@handles('registration.audit')
+def audit_registration(payload):
+    db.session.add(AuditEntry(
+        action='registration.created',
+        workshop_id=payload['workshop_id'],
+        student_id=payload['student_id'],
+        registration_id=payload['registration_id'],
+        occurred_at=datetime.fromisoformat(payload['occurred_at'])
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Already written by an earlier attempt of this job
+        db.session.rollback()
+
+
+@handles('workshops.purge')
+def purge_workshops(payload):
+    removed = purge_deleted_workshops(pause=PURGE_PAUSE)
+    if removed['workshops']:
+        logger.info('Purged %(workshops)s deleted workshops and %(registrations)s registrations', removed)
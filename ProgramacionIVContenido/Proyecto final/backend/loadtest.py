@@ -0,0 +1,291 @@
+"""Load test for the workshops API.
+
+Runs a weighted mix of scenarios from many concurrent workers, either against
+an in-process app on a temporary database or against a running server, and
+reports throughput and p50/p95/p99 latency per endpoint.
+
+    python loadtest.py --concurrency 16 --duration 20
+    python loadtest.py --target http://127.0.0.1:5000 --concurrency 32 --ramp-up 10 \\
+        --mix list=50,get=30,create=5,update=5,register=8,delete=2 --max-p95 150
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+DEFAULT_MIX = 'list=40,get=30,create=8,update=8,register=12,delete=2'
+
+WORKSHOP = {
+    'name': 'Taller de carga',
+    'description': 'Generado por loadtest.py',
+    'date': '2025-07-01',
+    'time': '18:00',
+    'location': 'Sala 1',
+    'category': 'Tecnología',
+    'capacity': 1000000,
+}
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json=None):
+        response = self.client.open(path, method=method, json=json)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def request(self, method, path, json=None):
+        response = self.session.request(method, self.base_url + path, json=json, timeout=30)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+
+class WorkshopPool:
+    """Ids of workshops that scenarios can read, update, register to or delete."""
+
+    def __init__(self, minimum):
+        self.minimum = minimum
+        self._ids = []
+        self._deleted = set()
+        self._lock = threading.Lock()
+
+    def add(self, workshop_id):
+        with self._lock:
+            self._ids.append(workshop_id)
+
+    def pick(self, rng):
+        with self._lock:
+            return rng.choice(self._ids) if self._ids else None
+
+    def take(self, rng):
+        # Never drain the pool below `minimum` so other scenarios keep working
+        with self._lock:
+            if len(self._ids) <= self.minimum:
+                return None
+            workshop_id = self._ids.pop(rng.randrange(len(self._ids)))
+            self._deleted.add(workshop_id)
+            return workshop_id
+
+    def deleted(self, workshop_id):
+        """Whether a delete scenario took `workshop_id` (it may be gone already)."""
+        with self._lock:
+            return workshop_id in self._deleted
+
+
+emails = itertools.count(1)
+
+
+def succeeded(status):
+    return 200 <= status < 300
+
+
+def request_workshop(client, pool, rng, method, suffix='', json=None):
+    """Send a request about a workshop picked from the pool.
+
+    Returns None when the pool is empty (nothing was sent). A 404 for a
+    workshop that a delete scenario took in the meantime is a race between
+    workers, not an error.
+    """
+    workshop_id = pool.pick(rng)
+    if workshop_id is None:
+        return None
+    status, _ = client.request(method, f'/workshops/{workshop_id}{suffix}', json=json)
+    return succeeded(status) or (status == 404 and pool.deleted(workshop_id))
+
+
+# Scenarios return whether the response was the expected one, or None when
+# they were skipped without sending anything
+def scenario_list(client, pool, rng):
+    status, _ = client.request('GET', '/workshops?limit=20')
+    return succeeded(status)
+
+
+def scenario_get(client, pool, rng):
+    return request_workshop(client, pool, rng, 'GET')
+
+
+def scenario_create(client, pool, rng):
+    status, body = client.request('POST', '/workshops', json=WORKSHOP)
+    if status == 201:
+        pool.add(body['id'])
+    return succeeded(status)
+
+
+def scenario_update(client, pool, rng):
+    return request_workshop(client, pool, rng, 'PUT', json=dict(WORKSHOP, name='Taller actualizado'))
+
+
+def scenario_register(client, pool, rng):
+    student = {'name': 'Estudiante', 'email': f'carga{next(emails)}-{os.getpid()}@example.com'}
+    return request_workshop(client, pool, rng, 'POST', '/register', json=student)
+
+
+def scenario_delete(client, pool, rng):
+    workshop_id = pool.take(rng)
+    if workshop_id is None:
+        return scenario_create(client, pool, rng)
+    status, _ = client.request('DELETE', f'/workshops/{workshop_id}')
+    return succeeded(status)
+
+
+SCENARIOS = {
+    'list': scenario_list,
+    'get': scenario_get,
+    'create': scenario_create,
+    'update': scenario_update,
+    'register': scenario_register,
+    'delete': scenario_delete,
+}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f'unknown scenario {name!r}, expected {", ".join(SCENARIOS)}')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'invalid weight for {name!r}: {weight!r}')
+    return mix
+
+
+def percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, int(round(fraction * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed_ms, ok):
+        with self._lock:
+            self.latencies[name].append(elapsed_ms)
+            if not ok:
+                self.errors[name] += 1
+
+
+def run(make_client, args):
+    pool = WorkshopPool(minimum=max(1, args.seed_workshops // 2))
+    seeder = make_client()
+    for _ in range(args.seed_workshops):
+        scenario_create(seeder, pool, random)
+
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    recorder = Recorder()
+    ramp_up = Recorder()
+    # Throughput is measured at full concurrency; requests sent during the
+    # ramp-up go to a recorder that is not reported
+    measured_from = time.perf_counter() + args.ramp_up
+    deadline = measured_from + args.duration
+
+    def worker(number):
+        # Spread worker start times evenly across the ramp-up window
+        time.sleep(args.ramp_up * number / args.concurrency)
+        client = make_client()
+        rng = random.Random(args.seed + number)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            request_started = time.perf_counter()
+            try:
+                ok = SCENARIOS[name](client, pool, rng)
+            except Exception:
+                ok = False
+            if ok is None:
+                continue
+            target = recorder if request_started >= measured_from else ramp_up
+            target.record(name, (time.perf_counter() - request_started) * 1000, ok)
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - measured_from
+
+
+def report(recorder, elapsed):
+    print(f"{'endpoint':>9} | {'requests':>8} | {'errors':>6} | {'req/s':>8} | "
+          f"{'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'max ms':>7}")
+    print('-' * 84)
+    summary = {}
+    all_samples = []
+    for name in sorted(recorder.latencies):
+        samples = sorted(recorder.latencies[name])
+        all_samples.extend(samples)
+        summary[name] = percentile(samples, 0.95)
+        print(f'{name:>9} | {len(samples):>8} | {recorder.errors[name]:>6} | {len(samples) / elapsed:>8.1f} | '
+              f'{percentile(samples, 0.50):>7.2f} | {summary[name]:>7.2f} | '
+              f'{percentile(samples, 0.99):>7.2f} | {samples[-1]:>7.2f}')
+    all_samples.sort()
+    errors = sum(recorder.errors.values())
+    print('-' * 84)
+    print(f"{'total':>9} | {len(all_samples):>8} | {errors:>6} | {len(all_samples) / elapsed:>8.1f} | "
+          f'{percentile(all_samples, 0.50):>7.2f} | {percentile(all_samples, 0.95):>7.2f} | '
+          f'{percentile(all_samples, 0.99):>7.2f} | {all_samples[-1] if all_samples else 0:>7.2f}')
+    return summary, errors / max(1, len(all_samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test for the workshops API.')
+    parser.add_argument('--target', default='inprocess',
+                        help="'inprocess' (temporary database) or the base URL of a running server")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='seconds at full concurrency')
+    parser.add_argument('--ramp-up', type=float, default=0, help='seconds to start all workers')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'scenario weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--seed-workshops', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the scenario choice')
+    parser.add_argument('--max-p95', type=float, help='fail if any endpoint p95 exceeds this many ms')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.target == 'inprocess':
+            from app import create_app
+            app = create_app('sqlite:///' + os.path.join(tmp, 'loadtest.db'))
+            make_client = lambda: InProcessClient(app)  # noqa: E731
+        else:
+            make_client = lambda: HttpClient(args.target)  # noqa: E731
+
+        print(f'Target: {args.target} | concurrency {args.concurrency} | '
+              f'ramp-up {args.ramp_up:g}s | duration {args.duration:g}s\n')
+        recorder, elapsed = run(make_client, args)
+
+    p95, error_rate = report(recorder, elapsed)
+    failures = [f'{name} p95 {value:.1f} ms > {args.max_p95:g} ms'
+                for name, value in p95.items() if args.max_p95 and value > args.max_p95]
+    if error_rate > args.max_error_rate:
+        failures.append(f'error rate {error_rate:.2%} > {args.max_error_rate:.2%}')
+    if failures:
+        print('\n❌ ' + '\n❌ '.join(failures))
+        sys.exit(1)
+    print('\n✅ Within thresholds')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Request instrumentation for Flask apps, exposed in Prometheus text format.
+
+    metrics = Metrics(app, engine=db.engine, slow_request_ms=500)
+
+records for every request, labelled by method and route rule:
+
+- latency histogram and request count per status code
+- response size histogram (streamed responses are not counted)
+- SQL statements and time spent in them, when a SQLAlchemy engine is given
+
+and serves them on GET /metrics. With `slow_request_ms` set, requests slower
+than that are logged with their slowest queries.
+
+This file is self-contained (Flask, and SQLAlchemy only if an engine is
+passed) and the same copy is used by several apps of the repository.
+"""
+import logging
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+logger = logging.getLogger('metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SLOW_LOG_QUERIES = 5
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket', {**labels, 'le': _number(bound)}, cumulative
+        yield f'{name}_bucket', {**labels, 'le': '+Inf'}, self.count
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+
+class Metrics:
+    def __init__(self, app=None, engine=None, slow_request_ms=None):
+        self.slow_request_ms = slow_request_ms
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._latency = {}
+        self._sizes = {}
+        self._query_counts = {}
+        self._query_time = {}
+        self._callbacks = []
+        self.instrument_sql = False
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine=None):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.render)
+        app.extensions['metrics'] = self
+        if engine is not None:
+            self.instrument_engine(engine)
+
+    def instrument_engine(self, engine):
+        from sqlalchemy import event
+
+        # A connection runs one statement at a time, so it keeps a single start
+        # time. A statement that raises never reaches after_cursor_execute; its
+        # start is overwritten by the next one instead of pairing with it.
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_query(conn, cursor, statement, parameters, context, executemany):
+            conn.info['metrics_query_start'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def finish_query(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.pop('metrics_query_start', None)
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            if has_request_context() and hasattr(g, '_metrics_queries'):
+                g._metrics_queries.append((elapsed, statement))
+
+        self.instrument_sql = True
+
+    def add_callback(self, name, help_text, func, kind='gauge'):
+        """Export `func()` as a metric read at scrape time (e.g. cache hit counters)."""
+        self._callbacks.append((name, help_text, kind, func))
+
+    def _start_request(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_queries = []
+
+    def _finish_request(self, response):
+        started = getattr(g, '_metrics_started', None)
+        if started is None:
+            return response
+        # Streamed bodies are still being generated here, so their latency is
+        # the time to the first byte
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        key = (request.method, route)
+        queries = g._metrics_queries
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        with self._lock:
+            status_key = key + (str(response.status_code),)
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            self._histogram(self._latency, key, LATENCY_BUCKETS).observe(elapsed)
+            if size is not None:
+                self._histogram(self._sizes, key, SIZE_BUCKETS).observe(size)
+            if self.instrument_sql:
+                self._histogram(self._query_counts, key, QUERY_COUNT_BUCKETS).observe(len(queries))
+                self._histogram(self._query_time, key, LATENCY_BUCKETS).observe(
+                    sum(duration for duration, _ in queries)
+                )
+
+        if self.slow_request_ms is not None and elapsed * 1000 >= self.slow_request_ms:
+            self._log_slow_request(route, elapsed, response.status_code, queries)
+        return response
+
+    @staticmethod
+    def _histogram(histograms, key, buckets):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets)
+        return histogram
+
+    def _log_slow_request(self, route, elapsed, status, queries):
+        message = (f'Slow request: {request.method} {request.full_path.rstrip("?")} ({route}) -> {status} '
+                   f'in {elapsed * 1000:.1f} ms')
+        if self.instrument_sql:
+            message += f', {len(queries)} queries in {sum(d for d, _ in queries) * 1000:.1f} ms'
+        lines = [message]
+        for duration, statement in sorted(queries, key=lambda q: q[0], reverse=True)[:SLOW_LOG_QUERIES]:
+            lines.append(f'  {duration * 1000:8.2f} ms  {" ".join(statement.split())[:200]}')
+        logger.warning('\n'.join(lines))
+
+    def render(self):
+        with self._lock:
+            families = [
+                ('http_requests_total', 'counter', 'Requests handled, by status code.',
+                 list(self._counter_samples())),
+                _family('http_request_duration_seconds', 'Time spent handling the request.', self._latency),
+                _family('http_response_size_bytes', 'Response body size.', self._sizes),
+            ]
+            if self.instrument_sql:
+                families.append(_family('http_request_db_queries', 'SQL statements run per request.',
+                                        self._query_counts))
+                families.append(_family('http_request_db_seconds', 'Time spent in SQL statements per request.',
+                                        self._query_time))
+
+        for name, help_text, kind, func in self._callbacks:
+            families.append((name, kind, help_text, [(name, {}, func())]))
+
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for sample_name, labels, value in samples:
+                lines.append(f'{sample_name}{_labels(labels)} {_number(value)}')
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+    def _counter_samples(self):
+        for (method, route, status), value in sorted(self._requests.items()):
+            yield 'http_requests_total', {'method': method, 'route': route, 'status': status}, value
+
+
+def _family(name, help_text, histograms):
+    samples = []
+    for (method, route), histogram in sorted(histograms.items()):
+        samples.extend(histogram.samples(name, {'method': method, 'route': route}))
+    return name, 'histogram', help_text, samples
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else str(int(value))
+    return str(value)
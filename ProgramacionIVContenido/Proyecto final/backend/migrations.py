@@ -0,0 +1,150 @@
+"""In-place schema upgrades for databases created by older versions of the backend.
+
+db.create_all() only creates missing tables, so columns added to existing
+tables (and the data they replace) are migrated here, starting from the
+original workshop/student schema. Every step checks the live schema first
+and is a no-op when it has already been applied (or the table does not
+exist yet). New columns on existing tables need a step in STEPS.
+"""
+from sqlalchemy import inspect, text
+
+from models import Registration, Workshop
+
+
+def _columns(connection, table):
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return None
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def workshop_capacity(connection):
+    """Add `capacity` and the denormalized `enrolled` counter.
+
+    Returns True so upgrade() reports that the counters must be rebuilt.
+    """
+    columns = _columns(connection, 'workshop')
+    if columns is None or 'capacity' in columns:
+        return False
+
+    connection.execute(text('ALTER TABLE workshop ADD COLUMN capacity INTEGER NOT NULL DEFAULT 20'))
+    connection.execute(text('ALTER TABLE workshop ADD COLUMN enrolled INTEGER NOT NULL DEFAULT 0'))
+    return True
+
+
+def student_registrations(connection):
+    """Copy the enrollment kept in the old `student.workshop_id` into `registration`.
+
+    SQLite cannot drop a column that takes part in a foreign key, so the old
+    column stays and is cleared once its enrollments have been copied.
+    """
+    columns = _columns(connection, 'student')
+    if columns is None or 'workshop_id' not in columns:
+        return False
+    pending = connection.execute(text('SELECT 1 FROM student WHERE workshop_id IS NOT NULL LIMIT 1')).first()
+    if pending is None:
+        return False
+
+    Registration.__table__.create(connection, checkfirst=True)
+    # Enrollments in workshops that no longer exist are dropped
+    connection.execute(text(
+        "INSERT OR IGNORE INTO registration (workshop_id, student_id, created_at) "
+        "SELECT student.workshop_id, student.id, CURRENT_TIMESTAMP "
+        "FROM student JOIN workshop ON workshop.id = student.workshop_id"
+    ))
+    connection.execute(text('UPDATE student SET workshop_id = NULL WHERE workshop_id IS NOT NULL'))
+    return True
+
+
+def workshop_updated_at(connection):
+    """Add `updated_at`, the Last-Modified/ETag validator of each workshop."""
+    columns = _columns(connection, 'workshop')
+    if columns is None or 'updated_at' in columns:
+        return False
+
+    # ADD COLUMN only takes a constant default; the rows are stamped right after
+    connection.execute(text(
+        "ALTER TABLE workshop ADD COLUMN updated_at DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00'"
+    ))
+    connection.execute(text('UPDATE workshop SET updated_at = CURRENT_TIMESTAMP'))
+    return False
+
+
+def workshop_starts_at(connection):
+    """Replace the text `date`/`time` columns with an indexed DateTime `starts_at`."""
+    columns = _columns(connection, 'workshop')
+    if columns is None or 'starts_at' in columns or 'date' not in columns:
+        return False
+
+    connection.execute(text('ALTER TABLE workshop ADD COLUMN starts_at DATETIME'))
+    # Rows whose text could never be parsed keep at least their date, or the epoch
+    connection.execute(text(
+        "UPDATE workshop SET starts_at = COALESCE("
+        "datetime(date || ' ' || time), datetime(date), '1970-01-01 00:00:00')"
+    ))
+    for index in ('ix_workshop_date_id', 'ix_workshop_category_date_id', 'ix_workshop_location_date_id'):
+        connection.execute(text(f'DROP INDEX IF EXISTS {index}'))
+    connection.execute(text('ALTER TABLE workshop DROP COLUMN date'))
+    connection.execute(text('ALTER TABLE workshop DROP COLUMN time'))
+    # The starts_at indexes are created by workshop_indexes()
+    return False
+
+
+def workshop_deleted_at(connection):
+    """Add the soft delete column; its index is created by workshop_indexes()."""
+    columns = _columns(connection, 'workshop')
+    if columns is None or 'deleted_at' in columns:
+        return False
+
+    connection.execute(text('ALTER TABLE workshop ADD COLUMN deleted_at DATETIME'))
+    return False
+
+
+def workshop_indexes(connection):
+    """Create the Workshop indexes, rebuilding those whose partial WHERE changed.
+
+    Earlier versions indexed (starts_at, id) and friends over every row plus
+    a standalone deleted_at index, which led SQLite to sort the active rows
+    instead of walking the ordering index.
+    """
+    if _columns(connection, 'workshop') is None:
+        return False
+
+    for index in Workshop.__table__.indexes:
+        live = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :name"), {'name': index.name}
+        ).scalar()
+        partial = index.dialect_options['sqlite']['where'] is not None
+        if live is not None and ('WHERE' in live.upper()) != partial:
+            connection.execute(text(f'DROP INDEX {index.name}'))
+        index.create(connection, checkfirst=True)
+    return False
+
+
+# Every step returns True when Workshop.enrolled has to be rebuilt
+# afterwards, False otherwise (including when there was nothing to do)
+STEPS = (
+    workshop_capacity,
+    student_registrations,
+    workshop_updated_at,
+    # deleted_at first: the partial indexes on starts_at refer to it
+    workshop_deleted_at,
+    workshop_starts_at,
+    workshop_indexes,
+)
+
+
+def upgrade(engine):
+    """Apply every pending step; returns True if models.recount_enrolled() must run.
+
+    The recount is left to the caller because it needs the tables that
+    db.create_all() creates after the upgrade.
+    """
+    # The steps use SQLite syntax; other databases start from create_all()
+    if engine.dialect.name != 'sqlite':
+        return False
+    recount = False
+    for step in STEPS:
+        with engine.begin() as connection:
+            recount = step(connection) or recount
+    return recount
@@ -1,39 +1,230 @@
+import time
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# Columns needed to serialize a workshop with workshop_dict()
+WORKSHOP_FIELDS = (
+    'id', 'name', 'description', 'starts_at', 'location', 'category', 'capacity', 'enrolled'
+)
+
+
+# Keys of a serialized workshop, for sparse fieldsets (?fields=id,name)
+WORKSHOP_OUTPUT_FIELDS = (
+    'id', 'name', 'description', 'date', 'time', 'starts_at', 'location', 'category', 'capacity', 'enrolled'
+)
+
+
+def workshop_dict(row):
+    """Serialize a Workshop or any row exposing the WORKSHOP_FIELDS attributes."""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "date": row.starts_at.date().isoformat(),
+        "time": row.starts_at.strftime('%H:%M'),
+        "starts_at": row.starts_at.isoformat(),
+        "location": row.location,
+        "category": row.category,
+        "capacity": row.capacity,
+        "enrolled": row.enrolled
+    }
+
 class Workshop(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    date = db.Column(db.String(20), nullable=False)
-    time = db.Column(db.String(10), nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False)
     location = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50), nullable=False)
+    capacity = db.Column(db.Integer, nullable=False, default=20)
+    # Denormalized counter kept in step with Registration rows so listings
+    # never need a COUNT per workshop
+    enrolled = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set by DELETE; the row and its registrations are purged later in small
+    # batches by purge_deleted_workshops()
+    deleted_at = db.Column(db.DateTime)
+
+    # Keyset pagination and calendar queries walk (starts_at, id); the
+    # filtered listings seek on the equality column first so every page is
+    # an index range scan. The indexes only cover active workshops, which is
+    # every read (active_workshops()), so SQLite never prefers a lookup on
+    # `deleted_at IS NULL` followed by a sort. Purging reads the few deleted
+    # rows through its own partial index.
+    __table_args__ = (
+        db.Index('ix_workshop_starts_at_id', 'starts_at', 'id', sqlite_where=deleted_at.is_(None)),
+        db.Index('ix_workshop_category_starts_at_id', 'category', 'starts_at', 'id',
+                 sqlite_where=deleted_at.is_(None)),
+        db.Index('ix_workshop_location_starts_at_id', 'location', 'starts_at', 'id',
+                 sqlite_where=deleted_at.is_(None)),
+        db.Index('ix_workshop_deleted_at', 'deleted_at', sqlite_where=deleted_at.is_not(None)),
+    )
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "date": self.date,
-            "time": self.time,
-            "location": self.location,
-            "category": self.category
-        }
+        return workshop_dict(self)
+
+def active_workshops():
+    """Query over the workshops that have not been deleted; every read goes through it."""
+    return Workshop.query.filter(Workshop.deleted_at.is_(None))
+
+# Single-row table bumped in the same transaction as every catalog write, so
+# list responses can be revalidated without reading any workshop
+class CatalogVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
-# Optional Student model for Many-to-Many or simple registration log
 class Student(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    # Simple relationship: Student registers for a Workshop
-    workshop_id = db.Column(db.Integer, db.ForeignKey('workshop.id'), nullable=True)
-    
+
     def to_dict(self):
         return {
             "id": self.id,
             "name": self.name,
-            "email": self.email,
-            "workshop_id": self.workshop_id
+            "email": self.email
+        }
+
+# Many-to-many link: a student can join several workshops, but only once each
+class Registration(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    workshop_id = db.Column(db.Integer, db.ForeignKey('workshop.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    student = db.relationship('Student')
+
+    __table_args__ = (
+        db.UniqueConstraint('workshop_id', 'student_id', name='uq_registration_workshop_student'),
+        db.Index('ix_registration_student_id', 'student_id'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "workshop_id": self.workshop_id,
+            "student_id": self.student_id,
+            "created_at": self.created_at.isoformat()
+        }
+
+
+# Outbox of background jobs (see jobs.py). A job is inserted in the same
+# transaction as the change it describes and deleted once a worker ran it.
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    # 'pending' or 'running' until done; 'failed' after the last attempt
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # When the job may be claimed next: now for new jobs, the retry time after
+    # a failure, or the end of the lease while a worker is running it
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_job_status_available_at_id', 'status', 'available_at', 'id'),
+    )
+
+class AuditEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    action = db.Column(db.String(50), nullable=False)
+    workshop_id = db.Column(db.Integer, nullable=False)
+    student_id = db.Column(db.Integer)
+    registration_id = db.Column(db.Integer)
+    # When the audited change happened, not when the worker wrote the entry
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Jobs may run more than once; the constraint makes the entry idempotent
+    __table_args__ = (
+        db.UniqueConstraint('action', 'registration_id', name='uq_audit_entry_action_registration'),
+        db.Index('ix_audit_entry_workshop_id', 'workshop_id'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "action": self.action,
+            "workshop_id": self.workshop_id,
+            "student_id": self.student_id,
+            "registration_id": self.registration_id,
+            "occurred_at": self.occurred_at.isoformat()
         }
+
+
+def ensure_catalog_version():
+    if db.session.get(CatalogVersion, 1) is None:
+        db.session.add(CatalogVersion(id=1))
+        db.session.commit()
+
+
+def bump_catalog_version():
+    """Mark the catalog as changed; call before committing any workshop write."""
+    table = CatalogVersion.__table__
+    db.session.execute(
+        table.update().where(table.c.id == 1)
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+def get_catalog_version():
+    table = CatalogVersion.__table__
+    return db.session.execute(
+        db.select(table.c.version, table.c.updated_at).where(table.c.id == 1)
+    ).one()
+
+
+def recount_enrolled():
+    """Rebuild every Workshop.enrolled from the Registration table with one grouped aggregate."""
+    counts = dict(
+        db.session.query(Registration.workshop_id, db.func.count(Registration.id))
+        .group_by(Registration.workshop_id)
+    )
+    db.session.query(Workshop).update({Workshop.enrolled: 0}, synchronize_session=False)
+    if counts:
+        table = Workshop.__table__
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('wid'))
+            .values(enrolled=db.bindparam('count')),
+            [{'wid': wid, 'count': n} for wid, n in counts.items()]
+        )
+    bump_catalog_version()
+    db.session.commit()
+
+
+PURGE_BATCH_SIZE = 500
+
+
+def purge_deleted_workshops(batch_size=PURGE_BATCH_SIZE, pause=0):
+    """Remove soft-deleted workshops and their registrations for good.
+
+    Works in batches of `batch_size` rows, each in its own short transaction
+    (registrations first, then the workshops), sleeping `pause` seconds in
+    between so other writers never wait behind one long cascading delete.
+    Returns the number of workshops and registrations removed.
+    """
+    workshops = Workshop.__table__
+    registrations = Registration.__table__
+    deleted_ids = db.select(workshops.c.id).where(workshops.c.deleted_at.is_not(None))
+    removed = {'workshops': 0, 'registrations': 0}
+
+    for name, table, condition in (
+        ('registrations', registrations, registrations.c.workshop_id.in_(deleted_ids)),
+        ('workshops', workshops, workshops.c.deleted_at.is_not(None)),
+    ):
+        while True:
+            batch = db.select(table.c.id).where(condition).limit(batch_size)
+            count = db.session.execute(table.delete().where(table.c.id.in_(batch))).rowcount
+            db.session.commit()
+            removed[name] += count
+            if count < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return removed
@@ -0,0 +1,110 @@
+"""Benchmark: GET /workshops latency as the number of registered students grows.
+
+Compares the maintained `Workshop.enrolled` counter served by the API against
+the naive approach of running one COUNT(*) per workshop (N+1 queries).
+
+    python perf/bench_enrollment_counts.py --workshops 200 --steps 0 1000 10000 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import Registration, Student, Workshop, db, recount_enrolled  # noqa: E402
+
+
+def seed_workshops(count):
+    db.session.execute(insert(Workshop), [
+        {
+            'name': f'Taller {i}',
+            'description': 'Taller de prueba',
+            'starts_at': datetime(2025, 1, 1, 18) + timedelta(days=i % 365),
+            'location': f'Sala {i % 10}',
+            'category': 'Tecnología',
+            'capacity': 1000,
+            'enrolled': 0,
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def add_students(start, stop, workshops):
+    students = [
+        {'id': i + 1, 'name': f'Estudiante {i}', 'email': f'estudiante{i}@example.com'}
+        for i in range(start, stop)
+    ]
+    registrations = [{'student_id': i + 1, 'workshop_id': i % workshops + 1} for i in range(start, stop)]
+    for offset in range(0, len(students), 10000):
+        db.session.execute(insert(Student), students[offset:offset + 10000])
+        db.session.execute(insert(Registration), registrations[offset:offset + 10000])
+    db.session.commit()
+    recount_enrolled()
+
+
+def naive_listing():
+    result = []
+    for workshop in Workshop.query.all():
+        data = workshop.to_dict()
+        data['enrolled'] = Registration.query.filter_by(workshop_id=workshop.id).count()
+        result.append(data)
+    return result
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workshops', type=int, default=200)
+    parser.add_argument('--steps', type=int, nargs='+', default=[0, 1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Without the read-through cache every GET runs the listing query
+        app = create_app('sqlite:///' + os.path.join(tmp, 'bench.db'), config={'CACHE_BACKEND': 'none'})
+        client = app.test_client()
+
+        with app.app_context():
+            seed_workshops(args.workshops)
+            statements = []
+            event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(1))
+
+            print(f"{'students':>10} | {'GET /workshops':>15} | {'queries':>7} | {'naive N+1':>10} | {'queries':>7}")
+            print('-' * 63)
+            loaded = 0
+            for target in args.steps:
+                add_students(loaded, target, args.workshops)
+                loaded = target
+
+                statements.clear()
+                client.get('/workshops')
+                api_queries = len(statements)
+                api_ms = measure(lambda: client.get('/workshops'), args.repeat)
+
+                statements.clear()
+                naive_listing()
+                naive_queries = len(statements)
+                naive_ms = measure(naive_listing, max(1, args.repeat // 4))
+
+                print(f'{target:>10} | {api_ms:>12.2f} ms | {api_queries:>7} | {naive_ms:>7.2f} ms | {naive_queries:>7}')
+
+
+if __name__ == '__main__':
+    main()
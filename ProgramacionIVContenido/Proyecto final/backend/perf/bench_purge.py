@@ -0,0 +1,109 @@
+"""Benchmark: registration latency while deleted workshops are purged, one cascade vs small batches.
+
+Loads --deleted soft-deleted workshops holding --registrations registrations
+between them, then keeps registering students in a live workshop from a
+background thread while the deleted rows are removed either with one
+cascading DELETE transaction or with purge_deleted_workshops(). Reports how
+long the purge took and the latency of the concurrent registrations.
+
+    python perf/bench_purge.py --registrations 200000
+"""
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import create_app  # noqa: E402
+from jobs import PURGE_PAUSE  # noqa: E402
+from models import Registration, Workshop, db, purge_deleted_workshops  # noqa: E402
+
+CHUNK = 50000
+
+
+def load(deleted, registrations):
+    workshops = Workshop.__table__
+    db.session.execute(workshops.insert(), [
+        {
+            'name': f'T{i}', 'description': '-', 'starts_at': datetime(2025, 7, 1, 18), 'location': 'Sala',
+            'category': 'Tecnología', 'capacity': 10 ** 9, 'enrolled': 0, 'updated_at': datetime(2025, 1, 1),
+            'deleted_at': datetime(2025, 1, 1) if i else None,
+        }
+        for i in range(deleted + 1)
+    ])
+    db.session.commit()
+    # Workshop 1 stays live for the concurrent registrations
+    for offset in range(0, registrations, CHUNK):
+        db.session.execute(Registration.__table__.insert(), [
+            {'workshop_id': 2 + i % deleted, 'student_id': i + 1, 'created_at': datetime(2025, 1, 1)}
+            for i in range(offset, min(registrations, offset + CHUNK))
+        ])
+        db.session.commit()
+
+
+def cascade():
+    deleted = db.select(Workshop.id).where(Workshop.deleted_at.is_not(None))
+    db.session.execute(Registration.__table__.delete().where(Registration.workshop_id.in_(deleted)))
+    db.session.execute(Workshop.__table__.delete().where(Workshop.deleted_at.is_not(None)))
+    db.session.commit()
+
+
+def run(mode, args, tmp):
+    app = create_app('sqlite:///' + os.path.join(tmp, f'{mode}.db'))
+    with app.app_context():
+        load(args.deleted, args.registrations)
+
+    latencies = []
+    stop = threading.Event()
+
+    def register():
+        client = app.test_client()
+        for i in itertools.count():
+            if stop.is_set():
+                break
+            started = time.perf_counter()
+            client.post('/workshops/1/register', json={'name': 'Estudiante', 'email': f'{mode}{i}@example.com'})
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    writer = threading.Thread(target=register)
+    writer.start()
+    time.sleep(0.5)
+    warmup = len(latencies)
+    with app.app_context():
+        started = time.perf_counter()
+        if mode == 'cascade':
+            cascade()
+        else:
+            purge_deleted_workshops(pause=PURGE_PAUSE)
+        elapsed = time.perf_counter() - started
+    stop.set()
+    writer.join()
+
+    during = sorted(latencies[warmup:]) or [0]
+    p99 = during[min(len(during) - 1, int(len(during) * 0.99))]
+    print(f'{mode:>8} | {elapsed:>8.2f} s | {len(during):>8} | {statistics.median(during):>7.2f} ms '
+          f'| {p99:>7.1f} ms | {during[-1]:>8.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--deleted', type=int, default=20)
+    parser.add_argument('--registrations', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} | {'purge':>10} | {'requests':>8} | {'p50':>10} | {'p99':>10} | {'max':>11}")
+    print('-' * 72)
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('cascade', 'batched'):
+            run(mode, args, tmp)
+
+
+if __name__ == '__main__':
+    main()
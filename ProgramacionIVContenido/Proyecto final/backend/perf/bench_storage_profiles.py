@@ -0,0 +1,97 @@
+"""Benchmark: write throughput of each SQLite storage profile under concurrent writers.
+
+Every writer thread creates workshops and registers students through the API
+against a fresh database file, while reader threads poll GET /workshops.
+
+    python perf/bench_storage_profiles.py --writers 8 --writes 200 --readers 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import create_app  # noqa: E402
+from config import STORAGE_PROFILES  # noqa: E402
+
+WORKSHOP = {
+    'name': 'Taller de carga',
+    'description': 'Escritura concurrente',
+    'date': '2025-07-01',
+    'time': '18:00',
+    'location': 'Sala 1',
+    'category': 'Tecnología',
+    'capacity': 1000000,
+}
+
+
+def run_profile(profile, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app('sqlite:///' + os.path.join(tmp, 'bench.db'),
+                         config={'CACHE_BACKEND': 'none'}, storage_profile=profile)
+        workshop_id = app.test_client().post('/workshops', json=WORKSHOP).get_json()['id']
+
+        statuses = Counter()
+        lock = threading.Lock()
+        done = threading.Event()
+        reads = Counter()
+
+        def writer(number):
+            client = app.test_client()
+            local = Counter()
+            for i in range(args.writes):
+                if i % 2:
+                    response = client.post(f'/workshops/{workshop_id}/register',
+                                           json={'name': 'Estudiante', 'email': f'w{number}-{i}@example.com'})
+                else:
+                    response = client.post('/workshops', json=WORKSHOP)
+                local[response.status_code] += 1
+            with lock:
+                statuses.update(local)
+
+        def reader():
+            client = app.test_client()
+            while not done.is_set():
+                reads[client.get('/workshops?limit=20').status_code] += 1
+
+        readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+        writers = [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+        for thread in readers:
+            thread.start()
+        started = time.perf_counter()
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        for thread in readers:
+            thread.join()
+
+    total = args.writers * args.writes
+    failed = total - statuses[201]
+    return total / elapsed, failed, sum(reads.values()) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='writes per writer thread')
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--profiles', nargs='+', default=sorted(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} | {'writes/s':>9} | {'failed':>6} | {'reads/s':>8}")
+    print('-' * 46)
+    for profile in args.profiles:
+        writes_per_second, failed, reads_per_second = run_profile(profile, args)
+        print(f'{profile:>12} | {writes_per_second:>9.1f} | {failed:>6} | {reads_per_second:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark: calendar queries on a large workshop table, index range scan vs full scan.
+
+Loads --rows workshops spread over ten years, then times "next N upcoming",
+a one-week range and a category + week range through the indexed
+`starts_at` columns, and the same queries with the indexes disabled
+(`NOT INDEXED`), which is what the old text date/time columns forced.
+
+    python perf/bench_upcoming.py --rows 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import Workshop, db  # noqa: E402
+
+CATEGORIES = ('Tecnología', 'Emprendimiento', 'Habilidades Blandas', 'Creatividad', 'Salud')
+FIRST_DAY = datetime(2020, 1, 1, 8)
+CHUNK = 50000
+
+# Same filters as the API, including active_workshops()'s deleted_at IS NULL
+QUERIES = {
+    'next 10 upcoming':
+        'SELECT id FROM workshop {hint} WHERE deleted_at IS NULL AND starts_at >= :start '
+        'ORDER BY starts_at, id LIMIT 10',
+    'one week range':
+        'SELECT id FROM workshop {hint} WHERE deleted_at IS NULL AND starts_at >= :start AND starts_at < :end '
+        'ORDER BY starts_at, id LIMIT 100',
+    'category + week':
+        'SELECT id FROM workshop {hint} WHERE deleted_at IS NULL AND category = :category AND starts_at >= :start '
+        'AND starts_at < :end ORDER BY starts_at, id LIMIT 100',
+}
+
+
+def load(rows):
+    table = Workshop.__table__
+    minutes = 10 * 365 * 24 * 60
+    for offset in range(0, rows, CHUNK):
+        db.session.execute(table.insert(), [
+            {
+                'name': f'T{i}',
+                'description': '-',
+                'starts_at': FIRST_DAY + timedelta(minutes=(i * 7919) % minutes),
+                'location': f'Sala {i % 50}',
+                'category': CATEGORIES[i % len(CATEGORIES)],
+                'capacity': 20,
+                'enrolled': 0,
+                'updated_at': FIRST_DAY,
+            }
+            for i in range(offset, min(rows, offset + CHUNK))
+        ])
+        db.session.commit()
+
+
+def timed(sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.session.execute(text(sql), params).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app('sqlite:///' + os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            # The full-text triggers are irrelevant here and only slow the load down
+            for trigger in ('workshop_fts_ai', 'workshop_fts_ad', 'workshop_fts_au'):
+                db.session.execute(text(f'DROP TRIGGER IF EXISTS {trigger}'))
+            started = time.perf_counter()
+            load(args.rows)
+            db.session.execute(text('ANALYZE'))
+            print(f'Loaded {args.rows} workshops in {time.perf_counter() - started:.1f} s\n')
+
+            start = FIRST_DAY + timedelta(days=5 * 365)
+            params = {'start': start, 'end': start + timedelta(days=7), 'category': CATEGORIES[0]}
+
+            print(f"{'query':>18} | {'indexed':>10} | {'full scan':>10} | plan")
+            print('-' * 90)
+            for name, sql in QUERIES.items():
+                plan = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql.format(hint='')), params).all()
+                indexed = timed(sql.format(hint=''), params, args.repeat)
+                scan = timed(sql.format(hint='NOT INDEXED'), params, max(1, args.repeat // 10))
+                print(f'{name:>18} | {indexed:>7.2f} ms | {scan:>7.1f} ms | {plan[0][-1]}')
+
+
+if __name__ == '__main__':
+    main()
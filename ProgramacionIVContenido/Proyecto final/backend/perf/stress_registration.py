@@ -0,0 +1,76 @@
+"""Stress test: hundreds of concurrent registrations for one workshop must never overbook it.
+
+Fires --requests registrations (some of them repeated for the same student) at a
+workshop with --capacity seats from --workers threads and checks that exactly
+`capacity` of them succeed, that every other one is rejected with 409, and that
+`enrolled` matches the Registration rows.
+
+    python perf/stress_registration.py --capacity 50 --requests 300 --workers 32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import create_app  # noqa: E402
+from models import Registration, Workshop, db  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--capacity', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--duplicates', type=int, default=20,
+                        help='registrations that reuse the email of an earlier request')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app('sqlite:///' + os.path.join(tmp, 'stress.db'))
+        with app.app_context():
+            workshop = Workshop(name='Taller concurrido', description='Prueba de carga',
+                                starts_at=datetime(2025, 7, 1, 18), location='Sala 1', category='Tecnología',
+                                capacity=args.capacity)
+            db.session.add(workshop)
+            db.session.commit()
+            workshop_id = workshop.id
+
+        emails = [f'estudiante{i}@example.com' for i in range(args.requests - args.duplicates)]
+        emails += emails[:args.duplicates]
+        start = threading.Barrier(min(args.workers, len(emails)))
+        local = threading.local()
+
+        def register(email):
+            if not hasattr(local, 'client'):
+                local.client = app.test_client()
+                start.wait()
+            response = local.client.post(f'/workshops/{workshop_id}/register',
+                                         json={'name': 'Estudiante', 'email': email})
+            return response.status_code
+
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            statuses = Counter(pool.map(register, emails))
+
+        with app.app_context():
+            enrolled = db.session.get(Workshop, workshop_id).enrolled
+            registrations = Registration.query.filter_by(workshop_id=workshop_id).count()
+
+    print(f'responses: {dict(statuses)}')
+    print(f'capacity={args.capacity} enrolled={enrolled} registrations={registrations}')
+
+    expected = min(args.capacity, len(set(emails)))
+    assert statuses[201] == expected, f'expected {expected} successful registrations, got {statuses[201]}'
+    assert statuses[409] == len(emails) - expected, 'every other registration must be rejected with 409'
+    assert enrolled == registrations == expected, 'enrolled counter out of sync with registrations'
+    print('OK: no overbooking')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,84 +1,425 @@
-from flask import request
-from flask_restful import Resource, reqparse
-from models import db, Workshop, Student
-
-# Parsers
-workshop_parser = reqparse.RequestParser()
-workshop_parser.add_argument('name', type=str, required=True, help='Name is required')
-workshop_parser.add_argument('description', type=str, required=True, help='Description is required')
-workshop_parser.add_argument('date', type=str, required=True, help='Date is required')
-workshop_parser.add_argument('time', type=str, required=True, help='Time is required')
-workshop_parser.add_argument('location', type=str, required=True, help='Location is required')
-workshop_parser.add_argument('category', type=str, required=True, help='Category is required')
-
-student_parser = reqparse.RequestParser()
-student_parser.add_argument('name', type=str, required=True, help='Name is required')
-student_parser.add_argument('email', type=str, required=True, help='Email is required')
+import json
+from datetime import datetime, time, timedelta
+
+from flask import Response, request, stream_with_context
+from flask_restful import Resource, abort
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from models import (
+    db, Workshop, Student, Registration, WORKSHOP_FIELDS, WORKSHOP_OUTPUT_FIELDS, active_workshops,
+    bump_catalog_version, get_catalog_version, workshop_dict
+)
+from cache import get_cache, invalidate_workshops, list_key, workshop_key
+from conditional import canonical_query, item_etag, list_etag, not_modified, validator_headers
+from jobs import enqueue
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, keyset_page
+from responses import select_fields
+from search import search_workshops
+from validation import (
+    Schema, clock_time, email, field_list, id_list, integer, iso_date, iso_datetime, load_args, load_json,
+    string
+)
+
+# Ids per batch read, and per IN (...) clause when resolving them
+MAX_BATCH_IDS = 1000
+BATCH_QUERY_CHUNK = 500
+
+# Schemas: validators are built once here instead of on every request
+workshop_schema = Schema(
+    name=string(max_length=100),
+    description=string(),
+    date=iso_date(),
+    time=clock_time(),
+    location=string(max_length=100),
+    category=string(max_length=50),
+    capacity=integer(min_value=1, required=False)
+)
+
+student_schema = Schema(
+    name=string(max_length=100),
+    email=email()
+)
+
+listing_schema = Schema(
+    ids=id_list(max_items=MAX_BATCH_IDS, required=False),
+    fields=field_list(WORKSHOP_OUTPUT_FIELDS, required=False),
+    limit=integer(min_value=1, required=False),
+    after=string(required=False),
+    category=string(required=False),
+    location=string(required=False),
+    date_from=iso_date(required=False),
+    date_to=iso_date(required=False)
+)
+
+upcoming_schema = Schema(
+    start=iso_datetime(required=False),
+    end=iso_datetime(required=False),
+    category=string(required=False),
+    limit=integer(min_value=1, required=False, default=10),
+    after=string(required=False)
+)
+
+batch_schema = Schema(
+    ids=id_list(max_items=MAX_BATCH_IDS),
+    fields=field_list(WORKSHOP_OUTPUT_FIELDS, required=False)
+)
+
+search_schema = Schema(
+    q=string(max_length=200),
+    limit=integer(min_value=1, required=False, default=DEFAULT_PAGE_SIZE)
+)
+
+BULK_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+EXPORT_FETCH_SIZE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def workshop_columns(values):
+    # Typed schema values -> column values; capacity None means "not given"
+    columns = dict(values)
+    columns['starts_at'] = datetime.combine(columns.pop('date'), columns.pop('time'))
+    if columns['capacity'] is None:
+        del columns['capacity']
+    return columns
+
+
+def validate_workshop_row(row):
+    if not isinstance(row, dict):
+        return None, 'Row must be a JSON object'
+    values, errors = workshop_schema.validate(row)
+    return (workshop_columns(values), None) if values else (None, errors)
+
+
+def _iter_lines(stream):
+    # Iterating the WSGI stream directly reads one byte at a time; read big
+    # chunks and split them instead
+    pending = b''
+    while True:
+        chunk = stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def workshops_by_id(ids):
+    """Serialize the workshops with the given ids in the requested order.
+
+    Ids are resolved with one IN query per BATCH_QUERY_CHUNK unique ids;
+    unknown ids get a ``{'id': ..., 'error': 'Workshop not found'}`` marker.
+    """
+    unique = list(dict.fromkeys(ids))
+    found = {}
+    for start in range(0, len(unique), BATCH_QUERY_CHUNK):
+        statement = select(*(getattr(Workshop, field) for field in WORKSHOP_FIELDS)).where(
+            Workshop.id.in_(unique[start:start + BATCH_QUERY_CHUNK]), Workshop.deleted_at.is_(None)
+        )
+        for row in db.session.execute(statement):
+            found[row.id] = workshop_dict(row)
+    return [found.get(i) or {'id': i, 'error': 'Workshop not found'} for i in ids]
+
+
+def workshop_fields(items, fields):
+    # Not-found markers of batch reads are kept whole
+    if fields is None:
+        return items
+    projected = select_fields(items, fields)
+    return [item if 'error' in item else fields_only for item, fields_only in zip(items, projected)]
+
+
+def batch_payload(ids, version, fields=None):
+    cache = get_cache()
+    key = list_key(version, 'ids=' + ','.join(map(str, ids)))
+    payload = cache.get(key)
+    if payload is None:
+        payload = {'items': workshops_by_id(ids)}
+        cache.set(key, payload)
+    return {'items': workshop_fields(payload['items'], fields)}
+
+
+def get_active_or_404(workshop_id):
+    return active_workshops().filter(Workshop.id == workshop_id).first_or_404()
+
+
+def _insert_workshops(rows):
+    db.session.execute(insert(Workshop), rows)
+    bump_catalog_version()
+    db.session.commit()
+    invalidate_workshops()
+    return len(rows)
 
 class WorkshopListResource(Resource):
     def get(self):
-        workshops = Workshop.query.all()
-        return [w.to_dict() for w in workshops]
+        args = load_args(listing_schema)
+
+        # Read the version before the rows: a write landing in between only
+        # costs the client a refetch, never a stale cached page
+        version, last_modified = get_catalog_version()
+        etag = list_etag(version)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        headers = validator_headers(etag, last_modified)
+
+        # ?ids=1,2,3 is a batch read; the other listing parameters do not apply
+        if args['ids'] is not None:
+            return batch_payload(args['ids'], version, args['fields']), 200, headers
+
+        cache = get_cache()
+        key = list_key(version, canonical_query())
+        payload = cache.get(key)
+        if payload is not None:
+            return payload, 200, headers
+
+        query = active_workshops()
+        if args['category']:
+            query = query.filter(Workshop.category == args['category'])
+        if args['location']:
+            query = query.filter(Workshop.location == args['location'])
+        if args['date_from']:
+            query = query.filter(Workshop.starts_at >= datetime.combine(args['date_from'], time.min))
+        if args['date_to']:
+            # Inclusive: everything before the start of the following day
+            query = query.filter(Workshop.starts_at < datetime.combine(args['date_to'] + timedelta(days=1), time.min))
+
+        # Without limit/after keep returning the plain list for existing clients
+        if args['limit'] is None and args['after'] is None:
+            payload = workshop_fields([w.to_dict() for w in query.all()], args['fields'])
+            cache.set(key, payload)
+            return payload, 200, headers
+
+        try:
+            workshops, next_cursor = keyset_page(
+                query, [Workshop.starts_at, Workshop.id], args['limit'], args['after']
+            )
+        except InvalidCursor as e:
+            abort(400, message=str(e))
+        payload = {
+            'items': workshop_fields([w.to_dict() for w in workshops], args['fields']),
+            'next_cursor': next_cursor
+        }
+        cache.set(key, payload)
+        return payload, 200, headers
 
     def post(self):
-        args = workshop_parser.parse_args()
-        new_workshop = Workshop(
-            name=args['name'],
-            description=args['description'],
-            date=args['date'],
-            time=args['time'],
-            location=args['location'],
-            category=args['category']
-        )
+        new_workshop = Workshop(**workshop_columns(load_json(workshop_schema)))
         db.session.add(new_workshop)
+        bump_catalog_version()
         db.session.commit()
+        invalidate_workshops()
         return new_workshop.to_dict(), 201
 
 class WorkshopResource(Resource):
     def get(self, workshop_id):
-        workshop = Workshop.query.get_or_404(workshop_id)
-        return workshop.to_dict()
+        # Revalidate against the timestamp column alone before loading the row
+        updated_at = db.session.execute(
+            select(Workshop.__table__.c.updated_at)
+            .where(Workshop.__table__.c.id == workshop_id, Workshop.__table__.c.deleted_at.is_(None))
+        ).scalar()
+        if updated_at is None:
+            abort(404)
+        etag = item_etag(workshop_id, updated_at)
+        cached = not_modified(etag, updated_at)
+        if cached:
+            return cached
+
+        cache = get_cache()
+        payload = cache.get(workshop_key(workshop_id, updated_at))
+        if payload is not None:
+            return payload, 200, validator_headers(etag, updated_at)
+
+        workshop = get_active_or_404(workshop_id)
+        payload = workshop.to_dict()
+        cache.set(workshop_key(workshop.id, workshop.updated_at), payload)
+        etag = item_etag(workshop.id, workshop.updated_at)
+        return payload, 200, validator_headers(etag, workshop.updated_at)
 
     def put(self, workshop_id):
-        workshop = Workshop.query.get_or_404(workshop_id)
-        args = workshop_parser.parse_args()
-        
-        workshop.name = args['name']
-        workshop.description = args['description']
-        workshop.date = args['date']
-        workshop.time = args['time']
-        workshop.location = args['location']
-        workshop.category = args['category']
-        
+        workshop = get_active_or_404(workshop_id)
+        for column, value in workshop_columns(load_json(workshop_schema)).items():
+            setattr(workshop, column, value)
+
+        bump_catalog_version()
         db.session.commit()
+        invalidate_workshops(workshop_id)
         return workshop.to_dict()
 
     def delete(self, workshop_id):
-        workshop = Workshop.query.get_or_404(workshop_id)
-        db.session.delete(workshop)
+        # Soft delete: a single-row UPDATE now, registrations are purged in
+        # small batches by the worker so the write lock is never held long
+        workshop = get_active_or_404(workshop_id)
+        workshop.deleted_at = datetime.utcnow()
+        bump_catalog_version()
+        enqueue('workshops.purge')
         db.session.commit()
+        invalidate_workshops(workshop_id)
         return {'message': 'Workshop deleted'}, 200
 
 class WorkshopRegistration(Resource):
     def post(self, workshop_id):
-        workshop = Workshop.query.get_or_404(workshop_id)
-        args = student_parser.parse_args()
-        
-        # Check if email is already registered for this workshop (optional logic)
-        # existing_student = Student.query.filter_by(email=args['email'], workshop_id=workshop_id).first()
-        # if existing_student:
-        #     return {'message': 'Student already registered'}, 400
-
-        new_student = Student(
-            name=args['name'],
-            email=args['email'],
-            workshop_id=workshop.id
-        )
-        db.session.add(new_student)
-        db.session.commit()
-        
+        args = load_json(student_schema)
+
+        # Reserve the seat first with a conditional UPDATE: it is atomic, and on
+        # SQLite it also takes the write lock, so the rest of this transaction
+        # is serialized against other registrations.
+        reserved = active_workshops().filter(
+            Workshop.id == workshop_id,
+            Workshop.enrolled < Workshop.capacity
+        ).update({Workshop.enrolled: Workshop.enrolled + 1}, synchronize_session=False)
+        if not reserved:
+            db.session.rollback()
+            get_active_or_404(workshop_id)
+            return {'message': 'Workshop is full'}, 409
+
+        student = Student.query.filter_by(email=args['email']).first()
+        if student is None:
+            student = Student(name=args['name'], email=args['email'])
+            db.session.add(student)
+        elif Registration.query.filter_by(workshop_id=workshop_id, student_id=student.id).first():
+            db.session.rollback()
+            return {'message': 'Student already registered'}, 409
+
+        registration = Registration(workshop_id=workshop_id, student=student)
+        db.session.add(registration)
+        bump_catalog_version()
+        try:
+            db.session.flush()
+            # Confirmation and audit run in the worker; the jobs are part of
+            # this transaction, so they exist only if the registration does
+            job = {
+                'registration_id': registration.id,
+                'workshop_id': workshop_id,
+                'student_id': student.id,
+                'occurred_at': registration.created_at.isoformat()
+            }
+            enqueue('registration.notify', **job)
+            enqueue('registration.audit', **job)
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race with another request for the same student
+            db.session.rollback()
+            return {'message': 'Student already registered'}, 409
+
+        invalidate_workshops(workshop_id)
         return {
             'message': 'Registration successful',
-            'student': new_student.to_dict(),
-            'workshop': workshop.to_dict()
+            'student': student.to_dict(),
+            'registration': registration.to_dict(),
+            'workshop': db.session.get(Workshop, workshop_id).to_dict()
         }, 201
+
+
+class WorkshopUpcomingResource(Resource):
+    def get(self):
+        # "Now" moves on every call, so this endpoint skips the catalog cache
+        args = load_args(upcoming_schema)
+        query = active_workshops().filter(Workshop.starts_at >= (args['start'] or datetime.now()))
+        if args['end']:
+            query = query.filter(Workshop.starts_at < args['end'])
+        if args['category']:
+            query = query.filter(Workshop.category == args['category'])
+
+        try:
+            workshops, next_cursor = keyset_page(
+                query, [Workshop.starts_at, Workshop.id], args['limit'], args['after']
+            )
+        except InvalidCursor as e:
+            abort(400, message=str(e))
+        return {
+            'items': [w.to_dict() for w in workshops],
+            'next_cursor': next_cursor
+        }
+
+
+class WorkshopBatchResource(Resource):
+    def post(self):
+        # Same as GET /workshops?ids=... for lists too long for a URL
+        args = load_json(batch_schema)
+        version, _ = get_catalog_version()
+        return batch_payload(args['ids'], version, args['fields'])
+
+
+class WorkshopSearchResource(Resource):
+    def get(self):
+        args = load_args(search_schema)
+
+        # Results only change with the catalog, so reuse the list validators
+        version, last_modified = get_catalog_version()
+        etag = list_etag(version)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        headers = validator_headers(etag, last_modified)
+
+        cache = get_cache()
+        key = list_key(version, 'search?' + canonical_query())
+        payload = cache.get(key)
+        if payload is None:
+            workshops = search_workshops(args['q'], min(args['limit'], MAX_PAGE_SIZE))
+            payload = {'items': [w.to_dict() for w in workshops]}
+            cache.set(key, payload)
+        return payload, 200, headers
+
+
+class CacheStatsResource(Resource):
+    def get(self):
+        return get_cache().stats()
+
+
+class WorkshopBulkResource(Resource):
+    def post(self):
+        inserted = 0
+        rejected = 0
+        errors = []
+        batch = []
+        received = False
+
+        # Read the body line by line so large catalogs are never held in memory,
+        # and commit every BULK_BATCH_SIZE valid rows
+        for line_number, line in enumerate(_iter_lines(request.stream), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            received = True
+
+            try:
+                values, error = validate_workshop_row(json.loads(line))
+            except ValueError:
+                values, error = None, 'Invalid JSON'
+            if error:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'line': line_number, 'message': error})
+                continue
+
+            batch.append(values)
+            if len(batch) >= BULK_BATCH_SIZE:
+                inserted += _insert_workshops(batch)
+                batch = []
+
+        if batch:
+            inserted += _insert_workshops(batch)
+        if not received:
+            return {'message': 'Request body must contain NDJSON rows'}, 400
+
+        return {'inserted': inserted, 'rejected': rejected, 'errors': errors}, 207 if rejected else 201
+
+
+class WorkshopExportResource(Resource):
+    def get(self):
+        statement = (
+            select(*(getattr(Workshop, field) for field in WORKSHOP_FIELDS))
+            .where(Workshop.deleted_at.is_(None))
+            .order_by(Workshop.id)
+            .execution_options(yield_per=EXPORT_FETCH_SIZE)
+        )
+
+        def generate():
+            for row in db.session.execute(statement):
+                yield json.dumps(workshop_dict(row), ensure_ascii=False) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
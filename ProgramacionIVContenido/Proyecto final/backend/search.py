@@ -0,0 +1,81 @@
+import re
+
+from sqlalchemy import inspect, or_, select, text
+
+from models import db, Workshop, active_workshops
+
+FTS_TABLE = 'workshop_fts'
+
+# External-content FTS5 index over the searchable Workshop columns. It stores
+# only the inverted index (the text stays in `workshop`) and the triggers keep
+# it in sync with every INSERT/UPDATE/DELETE, including bulk imports.
+# remove_diacritics lets "tecnologia" match "Tecnología"; the prefix option
+# pre-indexes 2 and 3 letter prefixes so "pyth*" style queries stay cheap.
+FTS_DDL = (
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, description, location, category,
+        content='workshop', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS workshop_fts_ai AFTER INSERT ON workshop BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, location, category)
+        VALUES (new.id, new.name, new.description, new.location, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS workshop_fts_ad AFTER DELETE ON workshop BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, location, category)
+        VALUES ('delete', old.id, old.name, old.description, old.location, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS workshop_fts_au
+        AFTER UPDATE OF name, description, location, category ON workshop BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, location, category)
+        VALUES ('delete', old.id, old.name, old.description, old.location, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, location, category)
+        VALUES (new.id, new.name, new.description, new.location, new.category);
+    END""",
+)
+
+# bm25 weights in column order: a hit in the name counts most
+RANK = f'bm25({FTS_TABLE}, 10.0, 1.0, 2.0, 4.0)'
+
+
+def install_search(engine):
+    """Create the FTS index and its triggers if missing, indexing existing rows once."""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as connection:
+        if inspect(connection).has_table(FTS_TABLE):
+            return
+        for statement in FTS_DDL:
+            connection.execute(text(statement))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query)
+
+
+def search_workshops(query, limit):
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if db.engine.dialect.name != 'sqlite':
+        return _search_like(terms, limit)
+
+    # Every term must match, each one as a prefix ("pyth" finds "Python")
+    match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+    statement = select(Workshop).from_statement(text(
+        f'SELECT workshop.* FROM {FTS_TABLE} '
+        f'JOIN workshop ON workshop.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH :match AND workshop.deleted_at IS NULL ORDER BY {RANK} LIMIT :limit'
+    ).bindparams(match=match, limit=limit))
+    return db.session.scalars(statement).all()
+
+
+def _search_like(terms, limit):
+    # Fallback for server databases without FTS5: unranked substring match
+    columns = (Workshop.name, Workshop.description, Workshop.location, Workshop.category)
+    query = active_workshops()
+    for term in terms:
+        query = query.filter(or_(*(column.ilike(f'%{term}%') for column in columns)))
+    return query.order_by(Workshop.name).limit(limit).all()
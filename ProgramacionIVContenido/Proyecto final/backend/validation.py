@@ -0,0 +1,167 @@
+import re
+from datetime import date, datetime
+
+from flask import request
+from flask_restful import abort
+
+from responses import parse_fields
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class Field:
+    """Declares one input field; `convert` turns the raw value into its typed form or raises ValueError."""
+
+    def __init__(self, convert, required=True, default=None):
+        self.convert = convert
+        self.required = required
+        self.default = default
+
+
+def string(max_length=None, **options):
+    def convert(value, label):
+        if not isinstance(value, str):
+            raise ValueError(f'{label} must be a string')
+        value = value.strip()
+        if not value:
+            raise ValueError(f'{label} is required')
+        if max_length and len(value) > max_length:
+            raise ValueError(f'{label} must be at most {max_length} characters')
+        return value
+    return Field(convert, **options)
+
+
+def integer(min_value=None, **options):
+    def convert(value, label):
+        # Query strings arrive as text, JSON bodies as numbers
+        if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f'{label} must be an integer')
+        if min_value is not None and value < min_value:
+            raise ValueError(f'{label} must be at least {min_value}')
+        return value
+    return Field(convert, **options)
+
+
+def id_list(max_items=None, **options):
+    # "1,2,3" in a query string or [1, 2, 3] in a JSON body; order and
+    # duplicates are kept
+    def convert(value, label):
+        items = value.split(',') if isinstance(value, str) else value
+        if not isinstance(items, list):
+            raise ValueError(f'{label} must be a list of ids')
+        ids = []
+        for item in items:
+            if isinstance(item, str) and item.strip().isdigit():
+                item = int(item)
+            if isinstance(item, bool) or not isinstance(item, int) or item < 1:
+                raise ValueError(f'{label} must contain positive integer ids')
+            ids.append(item)
+        if not ids:
+            raise ValueError(f'{label} is required')
+        if max_items and len(ids) > max_items:
+            raise ValueError(f'{label} must have at most {max_items} items')
+        return ids
+    return Field(convert, **options)
+
+
+def field_list(allowed, **options):
+    # "id,name" -> ('id', 'name'), only names from `allowed`
+    def convert(value, label):
+        if not isinstance(value, str):
+            raise ValueError(f'{label} must be a comma-separated list')
+        return parse_fields(value, allowed)
+    return Field(convert, **options)
+
+
+def iso_date(**options):
+    def convert(value, label):
+        try:
+            return date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{label} must be a date in YYYY-MM-DD format')
+    return Field(convert, **options)
+
+
+def iso_datetime(**options):
+    # Accepts a plain date (midnight) or a full ISO 8601 date and time;
+    # workshop times are stored as naive local time
+    def convert(value, label):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{label} must be a date or date-time in ISO 8601 format')
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+    return Field(convert, **options)
+
+
+def clock_time(**options):
+    def convert(value, label):
+        try:
+            return datetime.strptime(value, '%H:%M').time()
+        except (TypeError, ValueError):
+            raise ValueError(f'{label} must be a time in HH:MM format')
+    return Field(convert, **options)
+
+
+def email(max_length=100, **options):
+    as_string = string(max_length).convert
+
+    def convert(value, label):
+        value = as_string(value, label).lower()
+        if not EMAIL_RE.match(value):
+            raise ValueError(f'{label} is not a valid email address')
+        return value
+    return Field(convert, **options)
+
+
+class Schema:
+    """Validates a mapping against fields compiled once at import time.
+
+    Errors use the same shape as flask_restful.reqparse: ``{field: message}``.
+    """
+
+    def __init__(self, **fields):
+        self._fields = tuple(
+            (name, name.replace('_', ' ').capitalize(), field.convert, field.required, field.default)
+            for name, field in fields.items()
+        )
+
+    def validate(self, data):
+        if not isinstance(data, dict) and not hasattr(data, 'get'):
+            return None, 'Request body must be a JSON object'
+
+        values = {}
+        errors = {}
+        for name, label, convert, required, default in self._fields:
+            raw = data.get(name)
+            if raw is None or raw == '':
+                if required:
+                    errors[name] = f'{label} is required'
+                else:
+                    values[name] = default
+                continue
+            try:
+                values[name] = convert(raw, label)
+            except ValueError as e:
+                errors[name] = str(e)
+
+        return (None, errors) if errors else (values, None)
+
+
+def load_json(schema):
+    """Decode the request body once and validate it, aborting with 400 on errors."""
+    values, errors = schema.validate(request.get_json(silent=True))
+    if errors:
+        abort(400, message=errors)
+    return values
+
+
+def load_args(schema):
+    values, errors = schema.validate(request.args)
+    if errors:
+        abort(400, message=errors)
+    return values
@@ -0,0 +1,38 @@
+"""Background worker: runs the jobs queued by the API (registration confirmations, audit log).
+
+Uses the same DATABASE_URL as the API and reads jobs from its `job` table,
+so start it next to the server:
+
+    python worker.py            # poll forever
+    python worker.py --once     # drain the queue and exit
+"""
+import argparse
+import logging
+import time
+
+from app import create_app
+from jobs import get_broker, run_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='seconds to wait before polling an empty queue again')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    app = create_app(config={'JOB_BROKER': 'sql'})
+    with app.app_context():
+        logging.getLogger(__name__).info('Worker started, %s', get_broker().stats())
+        while True:
+            if run_jobs(args.batch_size):
+                continue
+            if args.once:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
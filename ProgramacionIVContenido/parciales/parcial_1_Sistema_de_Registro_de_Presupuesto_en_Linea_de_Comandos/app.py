@@ -1,74 +1,46 @@
-import json
-import os
-from typing import List, Dict, Any
-
-DATA_FILE = "articulos.json"
+import argparse
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
 
+from bulk import detect_format, read_articles, write_articles
+from journal import JournaledStore, scan_articles
+from reports import Report, adhoc_report
+from validation import parse_non_empty, parse_positive_float, parse_positive_int
 
-def load_articles() -> List[Dict[str, Any]]:
-    if not os.path.exists(DATA_FILE):
-        return []
+T = TypeVar("T")
 
-    with open(DATA_FILE, "r", encoding="utf-8") as file:
-        try:
-            return json.load(file)
-        except json.JSONDecodeError:
-            return []
+DATA_FILE = "articulos.json"
+ARTICLE_HEADERS = ["ID", "Nombre", "Categoría", "Cantidad", "Precio unitario", "Descripción"]
 
 
-def save_articles(articles: List[Dict[str, Any]]) -> None:
-    with open(DATA_FILE, "w", encoding="utf-8") as file:
-        json.dump(articles, file, ensure_ascii=False, indent=4)
+def load_articles() -> JournaledStore:
+    # Lee la instantánea y reaplica el diario; cada cambio posterior se
+    # guarda agregando una línea al diario, sin reescribir el archivo
+    return JournaledStore(DATA_FILE)
 
 
-def generate_id(articles: List[Dict[str, Any]]) -> int:
-    if not articles:
-        return 1
-    return max(article["id"] for article in articles) + 1
+def input_valid(prompt: str, parse: Callable[[str], T]) -> T:
+    # Las reglas viven en validation.py para que la importación masiva use las mismas
+    while True:
+        try:
+            return parse(input(prompt))
+        except ValueError as error:
+            print(f"⚠️ {error}")
 
 
 def input_non_empty(prompt: str) -> str:
-    while True:
-        value = input(prompt).strip()
-        if value:
-            return value
-        print("⚠️ El valor no puede estar vacío. Intente nuevamente.")
+    return input_valid(prompt, parse_non_empty)
 
 
 def input_positive_int(prompt: str) -> int:
-    while True:
-        value = input(prompt).strip()
-        if not value:
-            print("⚠️ El valor no puede estar vacío. Intente nuevamente.")
-            continue
-        if not value.isdigit():
-            print("⚠️ Debe ingresar un número entero positivo.")
-            continue
-        number = int(value)
-        if number <= 0:
-            print("⚠️ El número debe ser mayor a 0.")
-            continue
-        return number
+    return input_valid(prompt, parse_positive_int)
 
 
 def input_positive_float(prompt: str) -> float:
-    while True:
-        value = input(prompt).strip().replace(",", ".")
-        if not value:
-            print("⚠️ El valor no puede estar vacío. Intente nuevamente.")
-            continue
-        try:
-            number = float(value)
-        except ValueError:
-            print("⚠️ Debe ingresar un número. Ejemplo: 10.50")
-            continue
-        if number <= 0:
-            print("⚠️ El número debe ser mayor a 0.")
-            continue
-        return number
+    return input_valid(prompt, parse_positive_float)
 
 
-def register_article(articles: List[Dict[str, Any]]) -> None:
+def register_article(articles: JournaledStore) -> None:
     print("\n🆕 Registrar nuevo artículo")
     name = input_non_empty("Nombre: ")
     category = input_non_empty("Categoría: ")
@@ -76,21 +48,11 @@ def register_article(articles: List[Dict[str, Any]]) -> None:
     unit_price = input_positive_float("Precio unitario: ")
     description = input_non_empty("Descripción: ")
 
-    article = {
-        "id": generate_id(articles),
-        "nombre": name,
-        "categoria": category,
-        "cantidad": quantity,
-        "precio_unitario": unit_price,
-        "descripcion": description,
-    }
-
-    articles.append(article)
-    save_articles(articles)
+    article = articles.add(name, category, quantity, unit_price, description)
     print(f"✅ Artículo '{name}' registrado con éxito. ID asignado: {article['id']}\n")
 
 
-def search_articles(articles: List[Dict[str, Any]]) -> None:
+def search_articles(articles: JournaledStore) -> None:
     if not articles:
         print("\nNo hay artículos registrados aún.\n")
         return
@@ -102,9 +64,11 @@ def search_articles(articles: List[Dict[str, Any]]) -> None:
         return
 
     term = input_non_empty("Ingrese el término de búsqueda: ").lower()
-    key = "nombre" if criteria == "n" else "categoria"
 
-    results = [article for article in articles if term in article[key].lower()]
+    if criteria == "n":
+        results = articles.search_name(term)
+    else:
+        results = articles.search_category(term)
 
     if not results:
         print("\nNo se encontraron artículos que coincidan.\n")
@@ -115,19 +79,25 @@ def search_articles(articles: List[Dict[str, Any]]) -> None:
     print()
 
 
-def list_articles(articles: List[Dict[str, Any]]) -> None:
-    if not articles:
+def list_articles(articles: Iterable[Dict[str, Any]]) -> None:
+    # Se aceptan también los artículos leídos directo del archivo (scan_articles),
+    # por eso se revisa si hay filas después de recorrerlos
+    rows = table_rows(articles)
+    if not rows:
         print("\nNo hay artículos registrados aún.\n")
         return
 
     print("\n📋 Lista de artículos registrados:")
-    print_table(articles)
+    print_rows(rows)
     print()
 
 
-def print_table(articles: List[Dict[str, Any]]) -> None:
-    headers = ["ID", "Nombre", "Categoría", "Cantidad", "Precio unitario", "Descripción"]
-    rows = [
+def print_table(articles: Iterable[Dict[str, Any]]) -> None:
+    print_rows(table_rows(articles))
+
+
+def table_rows(articles: Iterable[Dict[str, Any]]) -> List[List[str]]:
+    return [
         [
             str(article["id"]),
             article["nombre"],
@@ -139,6 +109,8 @@ def print_table(articles: List[Dict[str, Any]]) -> None:
         for article in articles
     ]
 
+
+def print_rows(rows: List[List[str]], headers: List[str] = ARTICLE_HEADERS) -> None:
     widths = [max(len(header), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
     header_line = " | ".join(header.ljust(widths[i]) for i, header in enumerate(headers))
     separator = "-+-".join("-" * width for width in widths)
@@ -148,21 +120,21 @@ def print_table(articles: List[Dict[str, Any]]) -> None:
         print(" | ".join(row[i].ljust(widths[i]) for i in range(len(headers))))
 
 
-def select_article_by_id(articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+def select_article_by_id(articles: JournaledStore) -> Dict[str, Any]:
     list_articles(articles)
     if not articles:
         return {}
 
     article_id = input_positive_int("Ingrese el ID del artículo: ")
-    for article in articles:
-        if article["id"] == article_id:
-            return article
+    article = articles.get(article_id)
+    if article:
+        return article
 
     print("⚠️ No se encontró un artículo con ese ID.\n")
     return {}
 
 
-def edit_article(articles: List[Dict[str, Any]]) -> None:
+def edit_article(articles: JournaledStore) -> None:
     if not articles:
         print("\nNo hay artículos para editar.\n")
         return
@@ -179,32 +151,39 @@ def edit_article(articles: List[Dict[str, Any]]) -> None:
     new_price = input("Nuevo precio unitario (actual: ${:.2f}): ".format(article["precio_unitario"])).strip()
     new_description = input("Nueva descripción (actual: {}): ".format(article["descripcion"])).strip()
 
+    changes: Dict[str, Any] = {}
     if new_name:
-        article["nombre"] = new_name
+        changes["nombre"] = new_name
     if new_category:
-        article["categoria"] = new_category
+        changes["categoria"] = new_category
     if new_quantity:
         if new_quantity.isdigit() and int(new_quantity) > 0:
-            article["cantidad"] = int(new_quantity)
+            changes["cantidad"] = int(new_quantity)
         else:
             print("⚠️ Cantidad no válida. Se mantiene el valor anterior.")
     if new_price:
         try:
             parsed_price = float(new_price.replace(",", "."))
             if parsed_price > 0:
-                article["precio_unitario"] = parsed_price
+                changes["precio_unitario"] = parsed_price
             else:
                 print("⚠️ El precio debe ser mayor a 0. Se mantiene el valor anterior.")
         except ValueError:
             print("⚠️ Precio no válido. Se mantiene el valor anterior.")
     if new_description:
-        article["descripcion"] = new_description
-
-    save_articles(articles)
+        changes["descripcion"] = new_description
+
+    # El almacén reindexa nombre y categoría al actualizar; los campos no
+    # modificados conservan lo que otro proceso haya guardado mientras tanto
+    try:
+        articles.update(article["id"], **changes)
+    except KeyError:
+        print("⚠️ Otro usuario eliminó este artículo mientras se editaba.\n")
+        return
     print("✅ Artículo actualizado con éxito.\n")
 
 
-def delete_article(articles: List[Dict[str, Any]]) -> None:
+def delete_article(articles: JournaledStore) -> None:
     if not articles:
         print("\nNo hay artículos para eliminar.\n")
         return
@@ -220,22 +199,198 @@ def delete_article(articles: List[Dict[str, Any]]) -> None:
             return
     elif option == "2":
         name = input_non_empty("Ingrese el nombre del artículo a eliminar: ")
-        matches = [a for a in articles if a["nombre"].lower() == name.lower()]
-        if not matches:
+        article = articles.find_by_name(name)
+        if not article:
             print("⚠️ No se encontró un artículo con ese nombre.\n")
             return
-        article = matches[0]
     else:
         print("⚠️ Opción no válida.\n")
         return
 
-    articles.remove(article)
-    save_articles(articles)
+    if articles.delete(article["id"]) is None:
+        print("⚠️ Otro usuario ya eliminó este artículo.\n")
+        return
     print(f"✅ Artículo '{article['nombre']}' eliminado.\n")
 
 
-def main_menu() -> None:
+def report_articles(articles: JournaledStore) -> None:
+    if not articles:
+        print("\nNo hay artículos registrados aún.\n")
+        return
+
+    print("\n📊 Reporte del presupuesto")
+    term = input("Filtrar por categoría (Enter para todas): ").strip()
+    try:
+        if term:
+            report = adhoc_report(articles.search_category(term))
+        else:
+            # Los totales del presupuesto completo se mantienen con cada cambio
+            report = articles.report()
+    except ValueError as error:
+        print(f"\n⚠️ {error}\n")
+        return
+    if not report.count:
+        print("\nNo se encontraron artículos que coincidan.\n")
+        return
+
+    print_report(report)
+    print()
+
+
+def print_report(report: Report) -> None:
+    print(f"\nArtículos: {report.count}")
+    print(f"Total: ${report.total:.2f}")
+
+    print("\nTotales por categoría:")
+    print_rows(
+        [
+            [
+                category.name,
+                str(category.count),
+                f"${category.total:.2f}",
+                f"{category.total / report.total:.1%}" if report.total else "-",
+            ]
+            for category in report.categories
+        ],
+        ["Categoría", "Artículos", "Total", "% del total"],
+    )
+
+    print(f"\nArtículos más costosos (top {len(report.top)}):")
+    print_rows(
+        [
+            [
+                str(item.article["id"]),
+                item.article["nombre"],
+                item.article["categoria"],
+                f"${item.subtotal:.2f}",
+                f"${item.running:.2f}",
+            ]
+            for item in report.top
+        ],
+        ["ID", "Nombre", "Categoría", "Subtotal", "Acumulado"],
+    )
+
+
+def argument(parse: Callable[[str], T]) -> Callable[[str], T]:
+    # Convierte las reglas de validation.py en tipos de argparse con el mismo mensaje
+    def convert(value: str) -> T:
+        try:
+            return parse(value)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(str(error)) from None
+
+    return convert
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Sistema de Registro de Presupuesto. Sin subcomando se abre el menú interactivo."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="subcomando")
+
+    add = commands.add_parser("add", help="registrar un artículo")
+    add.add_argument("--nombre", required=True, type=argument(parse_non_empty))
+    add.add_argument("--categoria", required=True, type=argument(parse_non_empty))
+    add.add_argument("--cantidad", required=True, type=argument(parse_positive_int))
+    add.add_argument("--precio", required=True, type=argument(parse_positive_float))
+    add.add_argument("--descripcion", required=True, type=argument(parse_non_empty))
+
+    commands.add_parser("list", help="listar todos los artículos")
+
+    search = commands.add_parser("search", help="buscar por nombre o categoría")
+    criteria = search.add_mutually_exclusive_group(required=True)
+    criteria.add_argument("--nombre", type=argument(parse_non_empty))
+    criteria.add_argument("--categoria", type=argument(parse_non_empty))
+
+    bulk_import = commands.add_parser("import", help="importar artículos desde CSV o NDJSON")
+    bulk_import.add_argument("path", help="archivo .csv, .ndjson o .jsonl ('-' para la entrada estándar)")
+    bulk_import.add_argument("--formato", choices=["csv", "ndjson"])
+
+    export = commands.add_parser("export", help="exportar los artículos a CSV o NDJSON")
+    export.add_argument("path", help="archivo .csv, .ndjson o .jsonl ('-' para la salida estándar)")
+    export.add_argument("--formato", choices=["csv", "ndjson"])
+
+    report = commands.add_parser("report", help="reporte de totales")
+    report.add_argument("--categoria", type=argument(parse_non_empty))
+    return parser
+
+
+def run_command(args: argparse.Namespace) -> int:
+    if args.command == "list":
+        list_articles(scan_articles(DATA_FILE))
+        return 0
+
+    if args.command == "export":
+        file_format = detect_format(args.path, args.formato)
+        if args.path == "-":
+            count = write_articles(scan_articles(DATA_FILE), sys.stdout, file_format)
+        else:
+            with open(args.path, "w", encoding="utf-8", newline="") as file:
+                count = write_articles(scan_articles(DATA_FILE), file, file_format)
+            print(f"✅ {count} artículos exportados a '{args.path}'.")
+        return 0
+
+    if args.command == "import":
+        file_format = detect_format(args.path, args.formato)
+        if args.path == "-":
+            rows, errors = read_articles(sys.stdin, file_format)
+        else:
+            with open(args.path, "r", encoding="utf-8-sig", newline="") as file:
+                rows, errors = read_articles(file, file_format)
+        if errors:
+            # Se valida todo antes de escribir: o entra el archivo completo o nada
+            for error in errors[:20]:
+                print(f"⚠️ {error}", file=sys.stderr)
+            if len(errors) > 20:
+                print(f"⚠️ ... y {len(errors) - 20} errores más.", file=sys.stderr)
+            print("No se importó ningún artículo.", file=sys.stderr)
+            return 1
+
     articles = load_articles()
+    if args.command == "add":
+        article = articles.add(args.nombre, args.categoria, args.cantidad, args.precio, args.descripcion)
+        print(f"✅ Artículo '{article['nombre']}' registrado con éxito. ID asignado: {article['id']}")
+    elif args.command == "import":
+        imported = articles.add_many(rows)
+        if imported:
+            print(f"✅ {len(imported)} artículos importados (ID {imported[0]['id']} a {imported[-1]['id']}).")
+        else:
+            print("El archivo no tiene artículos.")
+    elif args.command == "search":
+        if args.nombre:
+            results = articles.search_name(args.nombre)
+        else:
+            results = articles.search_category(args.categoria)
+        if not results:
+            print("No se encontraron artículos que coincidan.")
+            return 1
+        print_table(results)
+    elif args.command == "report":
+        report = adhoc_report(articles.search_category(args.categoria)) if args.categoria else articles.report()
+        if not report.count:
+            print("No hay artículos para el reporte.")
+            return 1
+        print_report(report)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        main_menu()
+        return 0
+    try:
+        return run_command(args)
+    except (OSError, ValueError) as error:
+        print(f"⚠️ {error}", file=sys.stderr)
+        return 1
+
+
+def main_menu() -> None:
+    # El almacén (con sus índices) se carga recién cuando una opción lo necesita,
+    # así el menú aparece de inmediato aunque el presupuesto sea muy grande
+    articles: Optional[JournaledStore] = None
 
     print("Sistema de Registro de Presupuesto")
     print("=" * 34)
@@ -246,6 +401,7 @@ def main_menu() -> None:
         "3": ("Editar un artículo", edit_article),
         "4": ("Eliminar un artículo", delete_article),
         "5": ("Listar todos los artículos", list_articles),
+        "6": ("Reporte de totales", report_articles),
         "0": ("Salir", None),
     }
 
@@ -265,8 +421,16 @@ def main_menu() -> None:
             continue
 
         _, handler = action
+        if handler is list_articles and articles is None:
+            list_articles(scan_articles(DATA_FILE))
+            continue
+        if articles is None:
+            articles = load_articles()
+        else:
+            # Otros procesos pueden haber cambiado el presupuesto desde la última opción
+            articles.refresh()
         handler(articles)
 
 
 if __name__ == "__main__":
-    main_menu()
+    sys.exit(main())
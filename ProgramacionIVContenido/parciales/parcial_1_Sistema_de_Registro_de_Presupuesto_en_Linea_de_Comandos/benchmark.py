@@ -0,0 +1,144 @@
+"""Compara la lista de diccionarios original con ArticleStore sobre un presupuesto grande.
+
+    python benchmark.py --articles 1000000
+    python benchmark.py --articles 1000000 --load   # además, tiempos de carga del archivo
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from journal import JournaledStore, scan_articles
+from store import ArticleStore
+
+CATEGORIES = ["Materiales", "Ferretería", "Acabados", "Electricidad", "Plomería", "Herramientas",
+              "Transporte", "Mano de obra", "Pintura", "Jardinería"]
+WORDS = ["cemento", "arena", "grava", "bloque", "varilla", "tubo", "cable", "pintura", "clavo",
+         "tornillo", "brocha", "lija", "madera", "vidrio", "teja", "malla", "codo", "llave"]
+
+
+def make_articles(total: int) -> List[Dict[str, Any]]:
+    rng = random.Random(42)
+    return [
+        {
+            "id": i,
+            "nombre": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+            "categoria": rng.choice(CATEGORIES),
+            "cantidad": rng.randint(1, 500),
+            "precio_unitario": round(rng.uniform(0.1, 900), 2),
+            "descripcion": "-",
+        }
+        for i in range(1, total + 1)
+    ]
+
+
+# Operaciones tal como las hacía app.py sobre la lista
+def list_generate_id(articles):
+    return max(article["id"] for article in articles) + 1
+
+
+def list_get(articles, article_id):
+    for article in articles:
+        if article["id"] == article_id:
+            return article
+    return None
+
+
+def list_search(articles, key, term):
+    return [article for article in articles if term in article[key].lower()]
+
+
+def list_find_by_name(articles, name):
+    matches = [a for a in articles if a["nombre"].lower() == name.lower()]
+    return matches[0] if matches else None
+
+
+def list_report(articles):
+    # Lo que costaría el reporte recorriendo la lista en cada consulta
+    totals = {}
+    for article in articles:
+        key = article["categoria"].lower()
+        totals[key] = totals.get(key, 0) + article["cantidad"] * article["precio_unitario"]
+    return totals, sorted(articles, key=lambda a: a["cantidad"] * a["precio_unitario"])[-5:]
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def bench_load(articles: List[Dict[str, Any]]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "articulos.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(articles, file, ensure_ascii=False, indent=4)
+        print(f"archivo de {os.path.getsize(path) / 1024 ** 2:.0f} MB")
+
+        started = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as file:
+            ArticleStore(json.load(file))
+        print(f"{'json.load + índices':>24} | {time.perf_counter() - started:>6.2f} s")
+
+        started = time.perf_counter()
+        JournaledStore(path)
+        print(f"{'lectura por bloques':>24} | {time.perf_counter() - started:>6.2f} s")
+
+        started = time.perf_counter()
+        next(scan_articles(path))
+        print(f"{'primera fila a listar':>24} | {time.perf_counter() - started:>6.2f} s\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--load", action="store_true", help="medir también la carga del archivo")
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    if args.load:
+        bench_load(articles)
+    started = time.perf_counter()
+    store = ArticleStore(dict(article) for article in articles)
+    print(f"{args.articles} artículos; índices construidos en {time.perf_counter() - started:.1f} s")
+    started = time.perf_counter()
+    store.search_name("xyz")
+    print(f"índices de nombres (primera búsqueda por nombre) en {time.perf_counter() - started:.1f} s")
+    started = time.perf_counter()
+    store.report()
+    print(f"totales del reporte (primer reporte) en {time.perf_counter() - started:.1f} s\n")
+
+    rng = random.Random(7)
+    ids = [rng.randint(1, args.articles) for _ in range(100)]
+    rare_name = articles[args.articles // 2]["nombre"]
+    cases = [
+        ("nuevo id", lambda: list_generate_id(articles), lambda: store.next_id(), 3),
+        ("buscar por id", lambda: [list_get(articles, i) for i in ids[:3]],
+         lambda: [store.get(i) for i in ids[:3]], 3),
+        ("nombre exacto", lambda: list_find_by_name(articles, rare_name),
+         lambda: store.find_by_name(rare_name), 3),
+        ("nombre 'varilla cable'", lambda: list_search(articles, "nombre", "varilla cable"),
+         lambda: store.search_name("varilla cable"), 3),
+        ("nombre 'co' (corto)", lambda: list_search(articles, "nombre", "co"),
+         lambda: store.search_name("co"), 1),
+        ("categoría 'pint'", lambda: list_search(articles, "categoria", "pint"),
+         lambda: store.search_category("pint"), 3),
+        ("reporte de totales", lambda: list_report(articles), lambda: store.report(), 1),
+    ]
+
+    print(f"{'operación':>24} | {'lista':>10} | {'ArticleStore':>12} | resultados")
+    print("-" * 68)
+    for name, legacy, indexed, repeat in cases:
+        legacy_ms = timed(legacy, repeat)
+        indexed_ms = timed(indexed, repeat)
+        result = indexed()
+        size = len(result) if isinstance(result, list) else 1
+        print(f"{name:>24} | {legacy_ms:>7.1f} ms | {indexed_ms:>9.3f} ms | {size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from store import Article
+from validation import ARTICLE_FIELDS, parse_article
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+EXPORT_FIELDS = ["id", *ARTICLE_FIELDS]
+
+
+def detect_format(path: str, file_format: Optional[str] = None) -> str:
+    if file_format:
+        return file_format
+    detected = FORMATS.get(Path(path).suffix.lower())
+    if detected is None:
+        raise ValueError(f"No se reconoce el formato de '{path}'; use --formato csv o ndjson.")
+    return detected
+
+
+def read_articles(file: TextIO, file_format: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Lee y valida todas las filas de un archivo CSV o NDJSON.
+
+    Devuelve los artículos válidos (sin id) y los errores, uno por fila con
+    su número de línea, para que quien importa decida antes de escribir nada.
+    """
+    articles: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for line, row in _rows(file, file_format):
+        if isinstance(row, str):
+            errors.append(f"línea {line}: {row}")
+            continue
+        try:
+            articles.append(parse_article(row))
+        except ValueError as error:
+            errors.append(f"línea {line}, {error}")
+    return articles, errors
+
+
+def write_articles(articles: Iterable[Article], file: TextIO, file_format: str) -> int:
+    count = 0
+    if file_format == "csv":
+        writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for article in articles:
+            writer.writerow(article)
+            count += 1
+    else:
+        for article in articles:
+            file.write(json.dumps(article, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _rows(file: TextIO, file_format: str) -> Iterator[Tuple[int, Any]]:
+    # Cada fila es un diccionario, o el mensaje de error si no se pudo leer
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        missing = [field for field in ARTICLE_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            yield 1, f"faltan las columnas {', '.join(missing)}"
+            return
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                yield line, "no es un objeto JSON válido"
+                continue
+            yield line, row if isinstance(row, dict) else "no es un objeto JSON válido"
@@ -0,0 +1,314 @@
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from snapshot import iter_snapshot
+from store import Article, ArticleStore, bulk_build
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(file: BinaryIO) -> None:
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK se rinde después de 10 segundos; se sigue esperando
+                continue
+
+    def _unlock(file: BinaryIO) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(file: BinaryIO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file: BinaryIO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+# El diario se compacta cuando supera el tamaño de la instantánea (y al menos
+# este mínimo), así reescribir el archivo completo cuesta O(1) amortizado por operación
+COMPACT_MIN_BYTES = 1024 * 1024
+
+
+class JournaledStore(ArticleStore):
+    """ArticleStore persistido como instantánea JSON más un diario de operaciones.
+
+    Cada alta, edición o baja agrega una línea JSON al diario (`articulos.journal`)
+    y la sincroniza con el disco, en lugar de reescribir `articulos.json`. Al
+    cargar se lee la instantánea y se reaplica el diario; reaplicar una
+    operación dos veces deja el mismo resultado, y una última línea incompleta
+    (corte durante la escritura) se descarta. La compactación escribe la nueva
+    instantánea en un archivo temporal y la renombra de forma atómica.
+
+    Varios procesos pueden usar los mismos archivos a la vez:
+
+    - Las escrituras toman un candado exclusivo (`articulos.lock`), traen lo
+      que otros procesos agregaron al diario desde la última lectura y recién
+      entonces aplican el cambio, así los ids no se repiten y ninguna
+      escritura pisa a otra.
+    - Las lecturas no toman el candado. La versión que se conoce es la
+      generación del diario (cambia con cada compactación) más los bytes ya
+      leídos; `refresh()` lee solo lo nuevo, o todo si otro proceso compactó.
+      El diario se abre antes que la instantánea, y como la compactación
+      reemplaza ambos archivos con renombres atómicos, a lo sumo se reaplica
+      un diario ya incluido en la instantánea, que deja el mismo resultado.
+    """
+
+    def __init__(self, path: str, fsync: bool = True, compact_min_bytes: int = COMPACT_MIN_BYTES) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal")
+        self.lock_path = self.path.with_suffix(".lock")
+        self.fsync = fsync
+        self.compact_min_bytes = compact_min_bytes
+        self._snapshot_bytes = 0
+        self._generation: Optional[str] = None
+        self._journal_bytes = 0
+        # Profundidad de `_locked`: el candado se toma una sola vez por proceso
+        self._lock_depth = 0
+        self._recover()
+
+    def add(self, name: str, category: str, quantity: int, unit_price: float, description: str) -> Article:
+        with self._locked():
+            article = super().add(name, category, quantity, unit_price, description)
+            self._append({"op": "add", "article": article})
+        return article
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]) -> List[Article]:
+        # Una sola escritura (y un solo fsync) para todo el lote
+        with self._locked():
+            articles = super().add_many(rows)
+            self._append(*({"op": "add", "article": article} for article in articles))
+        return articles
+
+    def update(self, article_id: int, **changes: Any) -> Article:
+        """Aplica `changes` sobre la versión más reciente; KeyError si otro proceso lo eliminó."""
+        with self._locked():
+            article = super().update(article_id, **changes)
+            self._append({"op": "update", "id": article_id, "changes": changes})
+        return article
+
+    def delete(self, article_id: int) -> Optional[Article]:
+        with self._locked():
+            article = super().delete(article_id)
+            if article is not None:
+                self._append({"op": "delete", "id": article_id})
+        return article
+
+    def refresh(self) -> None:
+        """Incorpora lo que otros procesos escribieron desde la última lectura, sin tomar el candado."""
+        self._catch_up(truncate=False)
+
+    def compact(self) -> None:
+        with self._locked():
+            self._compact()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if self._lock_depth:
+            # flock sobre otro descriptor del mismo archivo esperaría al propio proceso
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        with open(self.lock_path, "a+b") as lock:
+            _lock(lock)
+            self._lock_depth = 1
+            try:
+                # Con el candado tomado nadie está escribiendo, así que una
+                # línea incompleta al final solo puede ser de un corte
+                self._catch_up(truncate=True)
+                yield
+            finally:
+                self._lock_depth = 0
+                _unlock(lock)
+
+    def _compact(self) -> None:
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.to_list(), file, ensure_ascii=False, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._snapshot_bytes = self.path.stat().st_size
+
+        # Si el proceso se corta antes de reemplazar el diario, al cargar se
+        # reaplica el anterior sobre la instantánea nueva. Ese diario termina
+        # con el último cambio incluido en ella (ver `_append`) y cada alta
+        # reemplaza el artículo completo, así que el resultado es el mismo
+        generation = uuid.uuid4().hex
+        meta = _encode({"op": "meta", "next_id": self.next_id(), "generation": generation})
+        temporary = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with open(temporary, "wb") as file:
+            file.write(meta)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.journal_path)
+        self._generation = generation
+        self._journal_bytes = len(meta)
+
+    def _recover(self) -> None:
+        journal = _open_journal(self.journal_path)
+        try:
+            if self.path.exists():
+                self._snapshot_bytes = self.path.stat().st_size
+                # Los índices se construyen a medida que se lee el archivo; si está
+                # dañado se conservan los artículos anteriores a la parte inválida
+                try:
+                    self.load(iter_snapshot(str(self.path)))
+                except json.JSONDecodeError:
+                    pass
+
+            self._generation = None
+            self._journal_bytes = 0
+            if journal is not None:
+                self._generation = _generation(journal)
+                self._replay_from(journal)
+        finally:
+            if journal is not None:
+                journal.close()
+
+    def _catch_up(self, truncate: bool) -> None:
+        journal = _open_journal(self.journal_path)
+        if journal is None:
+            return
+        with journal:
+            compacted = _generation(journal) != self._generation
+            if not compacted:
+                self._replay_from(journal)
+        if compacted:
+            # Otro proceso compactó: lo leído hasta ahora ya no sirve de base
+            self.clear()
+            self._recover()
+        if truncate and self._journal_bytes != self.journal_path.stat().st_size:
+            # Se recorta lo escrito a medias para no pegarle la próxima operación
+            os.truncate(self.journal_path, self._journal_bytes)
+
+    def _replay_from(self, journal: BinaryIO) -> None:
+        journal.seek(self._journal_bytes)
+        with bulk_build():
+            for record, size in _journal_records(journal):
+                self._replay(record)
+                self._journal_bytes += size
+
+    def _replay(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        if op == "add":
+            ArticleStore.insert(self, record["article"])
+        elif op == "update":
+            if self.get(record["id"]) is not None:
+                ArticleStore.update(self, record["id"], **record["changes"])
+        elif op == "delete":
+            ArticleStore.delete(self, record["id"])
+        elif op == "meta":
+            self._next_id = max(self._next_id, record["next_id"])
+
+    def _append(self, *records: Dict[str, Any]) -> None:
+        # Se llama con el candado tomado y el diario ya leído hasta el final
+        payload = b"".join(_encode(record) for record in records)
+        # Los cambios van al diario aunque enseguida se compacte: si el
+        # proceso se corta entre los dos renombres de `_compact`, el diario
+        # anterior tiene que llevar todo lo que ya está en la instantánea nueva
+        with open(self.journal_path, "ab") as journal:
+            journal.write(payload)
+            journal.flush()
+            if self.fsync:
+                os.fsync(journal.fileno())
+        self._journal_bytes += len(payload)
+        if self._journal_bytes > max(self.compact_min_bytes, self._snapshot_bytes):
+            self._compact()
+
+
+def scan_articles(path: str) -> Iterator[Article]:
+    """Artículos vigentes en orden de registro, leídos del disco sin construir un ArticleStore.
+
+    Sirve para listar apenas arranca el programa: la instantánea se recorre
+    mapeada en memoria y solo se guardan los cambios que registra el diario,
+    que se aplican a cada artículo al pasar por él.
+    """
+    snapshot = Path(path)
+    replaced: Dict[int, Optional[Article]] = {}
+    patches: Dict[int, Dict[str, Any]] = {}
+    # Como al cargar, el diario se lee antes que la instantánea
+    journal = _open_journal(snapshot.with_suffix(".journal"))
+    if journal is not None:
+        with journal:
+            for record, _ in _journal_records(journal):
+                op = record.get("op")
+                if op == "add":
+                    article = record["article"]
+                    replaced[article["id"]] = article
+                    patches.pop(article["id"], None)
+                elif op == "update":
+                    article_id = record["id"]
+                    if article_id not in replaced:
+                        patches.setdefault(article_id, {}).update(record["changes"])
+                    elif replaced[article_id] is not None:
+                        replaced[article_id] = {**replaced[article_id], **record["changes"]}
+                elif op == "delete":
+                    replaced[record["id"]] = None
+                    patches.pop(record["id"], None)
+
+    if snapshot.exists():
+        try:
+            for article in iter_snapshot(str(snapshot)):
+                article_id = article["id"]
+                if article_id in replaced:
+                    article = replaced.pop(article_id)
+                    if article is None:
+                        continue
+                elif article_id in patches:
+                    article.update(patches[article_id])
+                yield article
+        except json.JSONDecodeError:
+            pass
+
+    # Lo que queda son altas posteriores a la instantánea
+    for article_id in sorted(replaced):
+        if replaced[article_id] is not None:
+            yield replaced[article_id]
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _open_journal(path: Path) -> Optional[BinaryIO]:
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+
+def _generation(journal: BinaryIO) -> Optional[str]:
+    """Generación del diario: la escribe la compactación en la primera línea."""
+    journal.seek(0)
+    for record, _ in _journal_records(journal):
+        if record.get("op") == "meta":
+            return record.get("generation")
+        break
+    return None
+
+
+def _journal_records(journal: BinaryIO) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Operaciones del diario con su largo en bytes, hasta la primera línea incompleta o inválida."""
+    for line in journal:
+        if not line.endswith(b"\n"):
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return
+        yield record, len(line)
@@ -0,0 +1,195 @@
+import bisect
+import math
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # dependencia opcional, solo acelera los reportes filtrados grandes
+    np = None
+
+Article = Dict[str, Any]
+
+# Cantidad de artículos más caros que muestra el reporte
+TOP_ITEMS = 5
+# Desde cuántos artículos un reporte filtrado usa NumPy (si está instalado)
+COLUMNAR_MIN_ROWS = 10_000
+
+
+class CategoryTotal(NamedTuple):
+    name: str
+    count: int
+    total: Decimal
+
+
+class TopItem(NamedTuple):
+    article: Article
+    subtotal: float
+    running: float
+
+
+class Report(NamedTuple):
+    count: int
+    total: Decimal
+    categories: List[CategoryTotal]
+    top: List[TopItem]
+
+
+def subtotal(article: Article) -> float:
+    return article["cantidad"] * article["precio_unitario"]
+
+
+def invalid_amounts_error(ids: Iterable[int]) -> ValueError:
+    ids = sorted(ids)
+    shown = ", ".join(str(i) for i in ids[:10]) + (", ..." if len(ids) > 10 else "")
+    return ValueError(
+        f"No se puede calcular el reporte: hay artículos con un precio no válido (ID {shown}). "
+        "Edítelos o elimínelos."
+    )
+
+
+def _amount(article: Article) -> Decimal:
+    # Sumar y restar en decimal evita que los totales mantenidos acumulen
+    # error de redondeo tras miles de ediciones
+    return Decimal(repr(article["precio_unitario"])) * article["cantidad"]
+
+
+class BudgetTotals:
+    """Totales del presupuesto actualizados con cada alta, edición o baja.
+
+    - `total` y `by_category`: suma de `cantidad * precio_unitario`, general
+      y por categoría (agrupada sin distinguir mayúsculas).
+    - `_ranking`: pares (subtotal, -id) ordenados, para sacar los artículos
+      más caros sin recorrer el presupuesto.
+    - `_invalid`: ids con un subtotal NaN o infinito (datos guardados antes
+      de validar el precio). Quedan fuera de los totales, que nunca operan
+      con ellos, y el reporte se niega con un error hasta que se corrijan.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = Decimal(0)
+        self.by_category: Dict[str, CategoryTotal] = {}
+        self._ranking: List[Tuple[float, int]] = []
+        self._invalid: Set[int] = set()
+
+    def add(self, article: Article) -> None:
+        if self._exclude(article):
+            return
+        self._accumulate(article)
+        bisect.insort(self._ranking, (subtotal(article), -article["id"]))
+
+    def extend(self, articles: Iterable[Article]) -> None:
+        # Al armar los totales de muchos artículos se ordena el ranking una sola vez
+        for article in articles:
+            if self._exclude(article):
+                continue
+            self._accumulate(article)
+            self._ranking.append((subtotal(article), -article["id"]))
+        self._ranking.sort()
+
+    def remove(self, article: Article) -> None:
+        if article["id"] in self._invalid:
+            self._invalid.discard(article["id"])
+            return
+        amount = _amount(article)
+        key = article["categoria"].lower()
+        name, count, total = self.by_category[key]
+        if count == 1:
+            del self.by_category[key]
+        else:
+            self.by_category[key] = CategoryTotal(name, count - 1, total - amount)
+        self.count -= 1
+        self.total -= amount
+        entry = (subtotal(article), -article["id"])
+        index = bisect.bisect_left(self._ranking, entry)
+        if index < len(self._ranking) and self._ranking[index] == entry:
+            del self._ranking[index]
+
+    def _exclude(self, article: Article) -> bool:
+        if math.isfinite(subtotal(article)):
+            return False
+        self._invalid.add(article["id"])
+        return True
+
+    def _accumulate(self, article: Article) -> None:
+        amount = _amount(article)
+        key = article["categoria"].lower()
+        name, count, total = self.by_category.get(key, (article["categoria"], 0, Decimal(0)))
+        self.by_category[key] = CategoryTotal(name, count + 1, total + amount)
+        self.count += 1
+        self.total += amount
+
+    def report(self, get: Callable[[int], Optional[Article]], top: int = TOP_ITEMS) -> Report:
+        """Reporte con los totales actuales; ValueError si hay artículos con precio no válido."""
+        if self._invalid:
+            raise invalid_amounts_error(self._invalid)
+        items = []
+        running = 0.0
+        for amount, negative_id in reversed(self._ranking[-top:] if top > 0 else []):
+            running += amount
+            items.append(TopItem(get(-negative_id), amount, running))
+        categories = sorted(self.by_category.values(), key=lambda c: c.total, reverse=True)
+        return Report(self.count, self.total, categories, items)
+
+
+def adhoc_report(articles: Sequence[Article], top: int = TOP_ITEMS) -> Report:
+    """Reporte de un subconjunto (por ejemplo, una búsqueda), calculado en el momento.
+
+    Con muchos artículos y NumPy instalado se arma en columnas; si no, se
+    alimenta un BudgetTotals temporal. Ambos caminos dan el mismo reporte
+    (con NumPy los totales se suman en coma flotante y se redondean al centavo).
+    """
+    if np is not None and len(articles) >= COLUMNAR_MIN_ROWS:
+        return _columnar_report(articles, top)
+
+    totals = BudgetTotals()
+    totals.extend(articles)
+    by_id = {article["id"]: article for article in articles}
+    return totals.report(by_id.get, top)
+
+
+def _columnar_report(articles: Sequence[Article], top: int) -> Report:
+    size = len(articles)
+    keys: Dict[str, int] = {}
+    names: List[str] = []
+
+    def code(category: str) -> int:
+        key = category.lower()
+        if key not in keys:
+            keys[key] = len(names)
+            names.append(category)
+        return keys[key]
+
+    quantities = np.fromiter((a["cantidad"] for a in articles), dtype=np.float64, count=size)
+    prices = np.fromiter((a["precio_unitario"] for a in articles), dtype=np.float64, count=size)
+    codes = np.fromiter((code(a["categoria"]) for a in articles), dtype=np.intp, count=size)
+    subtotals = quantities * prices
+    finite = np.isfinite(subtotals)
+    if not finite.all():
+        raise invalid_amounts_error(articles[i]["id"] for i in np.flatnonzero(~finite).tolist())
+
+    totals = np.bincount(codes, weights=subtotals, minlength=len(names))
+    counts = np.bincount(codes, minlength=len(names))
+    categories = [
+        CategoryTotal(names[i], int(counts[i]), Decimal(repr(round(float(totals[i]), 2))))
+        for i in np.argsort(-totals, kind="stable")
+    ]
+
+    top = max(0, min(top, size))
+    best = np.empty(0, dtype=np.intp)
+    if top:
+        # Los que superan el k-ésimo subtotal, más los primeros registrados que lo igualan
+        threshold = np.partition(subtotals, size - top)[size - top]
+        above = np.flatnonzero(subtotals > threshold)
+        tied = np.flatnonzero(subtotals == threshold)[:top - len(above)]
+        best = np.concatenate((above, tied))
+    # Mayor subtotal primero; a igual subtotal, el registrado antes
+    best = best[np.lexsort((best, -subtotals[best]))]
+    running = np.cumsum(subtotals[best])
+    items = [
+        TopItem(articles[i], float(subtotals[i]), float(total))
+        for i, total in zip(best.tolist(), running.tolist())
+    ]
+    grand_total = Decimal(repr(round(float(subtotals.sum()), 2)))
+    return Report(size, grand_total, categories, items)
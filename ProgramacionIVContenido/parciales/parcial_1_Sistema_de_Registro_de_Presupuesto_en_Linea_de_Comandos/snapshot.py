@@ -0,0 +1,95 @@
+import codecs
+import json
+import mmap
+import os
+import re
+from typing import Iterator
+
+from store import Article
+
+# Bytes del archivo que se decodifican por vez; un artículo que queda cortado
+# entre dos bloques se vuelve a leer completo con el bloque siguiente
+CHUNK_BYTES = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"\s*")
+
+
+def iter_snapshot(path: str) -> Iterator[Article]:
+    """Recorre uno por uno los artículos de la instantánea (una lista JSON).
+
+    El archivo se mapea en memoria y se decodifica por bloques, así nunca se
+    tiene el texto completo ni una segunda lista con todos los artículos: quien
+    consume el generador puede ir indexando o imprimiendo mientras se lee.
+    Si el archivo está dañado se lanza `json.JSONDecodeError` al llegar a la
+    parte inválida, después de entregar los artículos anteriores.
+
+    Los artículos completos de cada bloque se decodifican en una sola llamada
+    (como una lista hasta la última `}`), que es tan rápida como `json.load` y
+    comparte las claves entre diccionarios; solo el artículo del borde del
+    bloque se decodifica por separado.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            raise json.JSONDecodeError("Expecting value", "", 0)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text = codecs.getincrementaldecoder("utf-8")()
+            buffer, pos, offset = "", 0, 0
+            opened = False
+            # Última `}` que no cerraba un artículo (estaba dentro de uno cortado)
+            failed_cut = -1
+            # madvise no existe en Windows y exige bloques alineados a páginas
+            release_pages = hasattr(mmap, "MADV_DONTNEED") and CHUNK_BYTES % mmap.PAGESIZE == 0
+
+            def more() -> bool:
+                nonlocal buffer, pos, offset, failed_cut
+                if offset >= size:
+                    return False
+                chunk = data[offset:offset + CHUNK_BYTES]
+                if release_pages:
+                    # Las páginas ya copiadas no se vuelven a leer
+                    data.madvise(mmap.MADV_DONTNEED, offset, len(chunk))
+                offset += len(chunk)
+                buffer = buffer[pos:] + text.decode(chunk, final=offset >= size)
+                pos = 0
+                failed_cut = -1
+                return True
+
+            while True:
+                pos = _whitespace.match(buffer, pos).end()
+                if pos == len(buffer):
+                    if not more():
+                        raise json.JSONDecodeError("Unterminated array", buffer, pos)
+                    continue
+
+                char = buffer[pos]
+                if not opened:
+                    if char != "[":
+                        raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                    opened = True
+                    pos += 1
+                elif char == "]":
+                    return
+                elif char == ",":
+                    pos += 1
+                else:
+                    cut = buffer.rfind("}")
+                    if cut > pos and cut != failed_cut:
+                        try:
+                            articles = _decoder.decode("[" + buffer[pos:cut + 1] + "]")
+                        except json.JSONDecodeError:
+                            failed_cut = cut
+                        else:
+                            pos = cut + 1
+                            yield from articles
+                            continue
+                    try:
+                        article, end = _decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        # Puede ser solo un artículo cortado al final del bloque
+                        if not more():
+                            raise
+                        continue
+                    pos = end
+                    yield article
@@ -0,0 +1,226 @@
+import gc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from reports import TOP_ITEMS, Article, BudgetTotals, Report
+
+# Los términos de búsqueda de al menos este largo usan el índice de trigramas
+TRIGRAM = 3
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+@contextmanager
+def bulk_build() -> Iterator[None]:
+    # Construir índices crea millones de objetos pequeños; sin pausar el
+    # recolector de ciclos, este recorre el heap una y otra vez
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class ArticleStore:
+    """Artículos en memoria con índices para que ninguna operación recorra la lista completa.
+
+    - `_by_id`: índice hash por id; su orden de inserción es el orden de listado.
+    - `_next_id`: contador monotónico, los ids no se reutilizan tras eliminar,
+      así que el orden por id coincide con el orden de registro.
+    - `_by_category`: id de los artículos agrupados por categoría (en minúsculas).
+    - `_by_name` y `_by_trigram`: nombres exactos y trigramas de cada nombre,
+      para buscar subcadenas sin comparar contra todos los artículos. Son los
+      índices más costosos, así que se construyen la primera vez que se usan
+      y desde entonces se mantienen con cada cambio.
+    - `_totals`: totales por categoría y ranking de subtotales para los
+      reportes; también se arma recién con el primer reporte.
+    """
+
+    def __init__(self, articles: Iterable[Article] = ()) -> None:
+        self.clear()
+        self.load(articles)
+
+    def clear(self) -> None:
+        self._by_id: Dict[int, Article] = {}
+        self._by_category: Dict[str, Set[int]] = {}
+        self._by_name: Optional[Dict[str, Set[int]]] = None
+        self._by_trigram: Optional[Dict[str, Set[int]]] = None
+        self._totals: Optional[BudgetTotals] = None
+        self._next_id = 1
+
+    def load(self, articles: Iterable[Article]) -> None:
+        """Inserta muchos artículos de una vez (al leer el archivo de datos)."""
+        with bulk_build():
+            for article in articles:
+                self.insert(article)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __bool__(self) -> bool:
+        return bool(self._by_id)
+
+    def __iter__(self) -> Iterator[Article]:
+        return iter(self._by_id.values())
+
+    def to_list(self) -> List[Article]:
+        return list(self._by_id.values())
+
+    def next_id(self) -> int:
+        return self._next_id
+
+    def get(self, article_id: int) -> Optional[Article]:
+        return self._by_id.get(article_id)
+
+    def insert(self, article: Article) -> Article:
+        """Agrega un artículo que ya tiene id (por ejemplo, al cargar el archivo).
+
+        Si el id ya existe, el artículo se reemplaza en su lugar. No pasa por
+        `delete`, que las subclases pueden sobrescribir para persistir la baja.
+        """
+        article_id = article["id"]
+        previous = self._by_id.get(article_id)
+        if previous is not None:
+            self._unindex(previous)
+        self._by_id[article_id] = article
+        self._next_id = max(self._next_id, article_id + 1)
+        self._index(article)
+        return article
+
+    def add(self, name: str, category: str, quantity: int, unit_price: float, description: str) -> Article:
+        article = {
+            "id": self._next_id,
+            "nombre": name,
+            "categoria": category,
+            "cantidad": quantity,
+            "precio_unitario": unit_price,
+            "descripcion": description,
+        }
+        return self.insert(article)
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]) -> List[Article]:
+        """Registra varios artículos (con las claves de `add` en español) asignando ids correlativos."""
+        with bulk_build():
+            return [
+                ArticleStore.add(
+                    self, row["nombre"], row["categoria"], row["cantidad"], row["precio_unitario"], row["descripcion"]
+                )
+                for row in rows
+            ]
+
+    def update(self, article_id: int, **changes: Any) -> Article:
+        article = self._by_id[article_id]
+        self._unindex(article)
+        article.update(changes)
+        self._index(article)
+        return article
+
+    def delete(self, article_id: int) -> Optional[Article]:
+        article = self._by_id.pop(article_id, None)
+        if article is not None:
+            self._unindex(article)
+        return article
+
+    def search_name(self, term: str) -> List[Article]:
+        """Artículos cuyo nombre contiene `term`, sin distinguir mayúsculas."""
+        term = term.lower()
+        if len(term) >= TRIGRAM:
+            candidates = None
+            # Se intersecan primero los conjuntos más pequeños
+            by_trigram = self._trigram_index()
+            for gram in sorted(trigrams(term), key=lambda g: len(by_trigram.get(g, ()))):
+                ids = by_trigram.get(gram)
+                if not ids:
+                    return []
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+            matches = (i for i in candidates if term in self._by_id[i]["nombre"].lower())
+        else:
+            # Términos cortos: se recorren los nombres distintos, no los artículos
+            matches = (i for name, ids in self._name_index().items() if term in name for i in ids)
+        return self._ordered(matches)
+
+    def search_category(self, term: str) -> List[Article]:
+        """Artículos cuya categoría contiene `term`; se compara contra cada categoría distinta."""
+        term = term.lower()
+        return self._ordered(
+            i for category, ids in self._by_category.items() if term in category for i in ids
+        )
+
+    def in_category(self, category: str) -> List[Article]:
+        return self._ordered(self._by_category.get(category.lower(), ()))
+
+    def find_by_name(self, name: str) -> Optional[Article]:
+        """Primer artículo (en orden de registro) cuyo nombre es exactamente `name`."""
+        ids = self._name_index().get(name.lower())
+        if not ids:
+            return None
+        return self._by_id[min(ids)]
+
+    def report(self, top: int = TOP_ITEMS) -> Report:
+        """Totales del presupuesto completo, a partir de los agregados que se mantienen."""
+        return self._totals_index().report(self.get, top)
+
+    def _name_index(self) -> Dict[str, Set[int]]:
+        if self._by_name is None:
+            self._by_name = {}
+            with bulk_build():
+                for article_id, article in self._by_id.items():
+                    self._by_name.setdefault(article["nombre"].lower(), set()).add(article_id)
+        return self._by_name
+
+    def _trigram_index(self) -> Dict[str, Set[int]]:
+        if self._by_trigram is None:
+            self._by_trigram = {}
+            with bulk_build():
+                for name, ids in self._name_index().items():
+                    for gram in trigrams(name):
+                        self._by_trigram.setdefault(gram, set()).update(ids)
+        return self._by_trigram
+
+    def _totals_index(self) -> BudgetTotals:
+        if self._totals is None:
+            self._totals = BudgetTotals()
+            with bulk_build():
+                self._totals.extend(self._by_id.values())
+        return self._totals
+
+    def _ordered(self, ids: Iterable[int]) -> List[Article]:
+        return [self._by_id[i] for i in sorted(ids)]
+
+    def _index(self, article: Article) -> None:
+        article_id = article["id"]
+        name = article["nombre"].lower()
+        self._by_category.setdefault(article["categoria"].lower(), set()).add(article_id)
+        if self._by_name is not None:
+            self._by_name.setdefault(name, set()).add(article_id)
+        if self._by_trigram is not None:
+            for gram in trigrams(name):
+                self._by_trigram.setdefault(gram, set()).add(article_id)
+        if self._totals is not None:
+            self._totals.add(article)
+
+    def _unindex(self, article: Article) -> None:
+        article_id = article["id"]
+        name = article["nombre"].lower()
+        _discard(self._by_category, article["categoria"].lower(), article_id)
+        if self._by_name is not None:
+            _discard(self._by_name, name, article_id)
+        if self._by_trigram is not None:
+            for gram in trigrams(name):
+                _discard(self._by_trigram, gram, article_id)
+        if self._totals is not None:
+            self._totals.remove(article)
+
+
+def _discard(index: Dict[str, Set[int]], key: str, article_id: int) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(article_id)
+        if not ids:
+            del index[key]
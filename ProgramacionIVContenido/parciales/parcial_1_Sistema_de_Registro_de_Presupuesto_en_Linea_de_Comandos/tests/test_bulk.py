@@ -0,0 +1,28 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from app import main
+from bulk import read_articles
+
+HEADER = "nombre,categoria,cantidad,precio_unitario,descripcion\n"
+
+
+@pytest.mark.parametrize("price", ["nan", "inf", "-Infinity", "1e400"])
+def test_import_rejects_non_finite_prices(tmp_path, monkeypatch, capsys, price):
+    monkeypatch.chdir(tmp_path)
+    Path("articulos.csv").write_text(HEADER + "Lápiz,Útiles,2,1.50,-\n" + f"Regla,Útiles,1,{price},-\n", encoding="utf-8")
+
+    assert main(["import", "articulos.csv"]) == 1
+
+    assert "línea 3, precio_unitario" in capsys.readouterr().err
+    # Se valida todo antes de escribir: tampoco entra la fila válida
+    assert not Path("articulos.json").exists() and not Path("articulos.journal").exists()
+
+
+def test_ndjson_nan_price_is_reported():
+    rows, errors = read_articles(io.StringIO(
+        '{"nombre": "Regla", "categoria": "Útiles", "cantidad": 1, "precio_unitario": NaN, "descripcion": "-"}\n'
+    ), "ndjson")
+    assert rows == [] and errors == ["línea 1, precio_unitario: Debe ingresar un número. Ejemplo: 10.50"]
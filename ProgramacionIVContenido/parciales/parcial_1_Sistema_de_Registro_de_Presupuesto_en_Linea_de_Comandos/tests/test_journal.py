@@ -0,0 +1,112 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from journal import JournaledStore
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Cada proceso abre el almacén (recuperando el diario) y registra artículos
+WRITER = """
+import sys
+from journal import JournaledStore
+
+store = JournaledStore(sys.argv[1], fsync=False, compact_min_bytes=int(sys.argv[3]))
+for i in range(int(sys.argv[2])):
+    store.add(f"Artículo {i}", "Útiles", 1, 1.0, "")
+with store._locked():
+    store.delete(store.add("Temporal", "Útiles", 1, 1.0, "")["id"])
+"""
+
+
+def _add(store, name="Lápiz", price=1.5):
+    return store.add(name, "Útiles", 2, price, "")
+
+
+def test_stale_journal_over_newer_snapshot_is_replayed(tmp_path):
+    # Compactación interrumpida: instantánea nueva y diario anterior
+    path = tmp_path / "articulos.json"
+    store = JournaledStore(str(path), fsync=False)
+    _add(store, "Lápiz")
+    _add(store, "Cuaderno", 3.0)
+    store.update(1, cantidad=5)
+    stale = tmp_path / "stale.journal"
+    shutil.copy(store.journal_path, stale)
+    store.compact()
+    shutil.copy(stale, store.journal_path)
+
+    reopened = JournaledStore(str(path), fsync=False)
+
+    assert reopened.to_list() == store.to_list()
+    assert reopened.next_id() == 3
+    assert [a["nombre"] for a in reopened.search_name("lápiz")] == ["Lápiz"]
+    # El diario sigue aceptando escrituras después de recuperar
+    assert _add(reopened, "Regla")["id"] == 3
+    assert [a["id"] for a in JournaledStore(str(path), fsync=False)] == [1, 2, 3]
+
+
+def test_crash_between_compaction_renames_keeps_last_write(tmp_path, monkeypatch):
+    path = tmp_path / "articulos.json"
+    store = JournaledStore(str(path), fsync=False)
+    _add(store, "Lápiz")
+    _add(store, "Cuaderno", 3.0)
+    replace = os.replace
+
+    def crash(source, target):
+        if str(target).endswith(".journal"):
+            raise KeyboardInterrupt
+        replace(source, target)
+
+    # La baja supera el umbral y compacta, pero el diario no llega a reemplazarse
+    store.compact_min_bytes = store._snapshot_bytes = 0
+    monkeypatch.setattr(os, "replace", crash)
+    try:
+        store.delete(1)
+    except KeyboardInterrupt:
+        pass
+    monkeypatch.undo()
+
+    assert [a["id"] for a in JournaledStore(str(path), fsync=False)] == [2]
+
+
+def _interrupted_compaction(path):
+    """Deja una instantánea compactada con el diario anterior y una línea a medias."""
+    store = JournaledStore(str(path), fsync=False)
+    _add(store, "Lápiz")
+    _add(store, "Cuaderno", 3.0)
+    stale = path.with_name("stale.journal")
+    shutil.copy(store.journal_path, stale)
+    store.compact()
+    shutil.copy(stale, store.journal_path)
+    with open(store.journal_path, "ab") as journal:
+        journal.write(b'{"op": "add", "art')
+    return store.to_list()
+
+
+def test_processes_recover_and_write_concurrently(tmp_path):
+    path = tmp_path / "articulos.json"
+    initial = _interrupted_compaction(path)
+    processes, writes = 4, 50
+    for compact_min_bytes in (1024 * 1024, 2048):
+        writers = [
+            subprocess.Popen(
+                [sys.executable, "-c", WRITER, str(path), str(writes), str(compact_min_bytes)],
+                cwd=PROJECT_ROOT,
+            )
+            for _ in range(processes)
+        ]
+        try:
+            # Un proceso que se bloquea a sí mismo no termina nunca
+            assert [writer.wait(timeout=60) for writer in writers] == [0] * processes
+        finally:
+            for writer in writers:
+                writer.kill()
+
+    articles = JournaledStore(str(path), fsync=False).to_list()
+    ids = [article["id"] for article in articles]
+    assert articles[:2] == initial
+    assert len(articles) == 2 + 2 * processes * writes
+    assert ids == sorted(set(ids))
+    assert all(article["nombre"] != "Temporal" for article in articles)
@@ -0,0 +1,24 @@
+from decimal import Decimal
+
+import pytest
+
+from store import ArticleStore
+
+
+def _article(article_id, price, category="Útiles"):
+    return {"id": article_id, "nombre": f"A{article_id}", "categoria": category,
+            "cantidad": 2, "precio_unitario": price, "descripcion": ""}
+
+
+def test_non_finite_prices_stay_out_of_the_totals():
+    # Datos guardados antes de validar el precio
+    store = ArticleStore([_article(1, 1.5), _article(2, float("nan")), _article(3, float("inf"), "Otros")])
+
+    with pytest.raises(ValueError, match=r"ID 2, 3"):
+        store.report()
+
+    store.update(2, precio_unitario=2.0)
+    store.delete(3)
+    report = store.report()
+    assert (report.count, report.total) == (2, Decimal("7.0"))
+    assert [item.article["id"] for item in report.top] == [2, 1]
@@ -0,0 +1,58 @@
+import math
+from typing import Any, Callable, Dict
+
+# Reglas de validación de los campos de un artículo. Lanzan ValueError con el
+# mensaje para el usuario; los prompts de app.py las repiten hasta que el valor
+# es válido y la importación masiva informa la línea que falla.
+
+
+def parse_non_empty(value: str) -> str:
+    value = value.strip()
+    if not value:
+        raise ValueError("El valor no puede estar vacío. Intente nuevamente.")
+    return value
+
+
+def parse_positive_int(value: str) -> int:
+    value = parse_non_empty(value)
+    if not value.isdigit():
+        raise ValueError("Debe ingresar un número entero positivo.")
+    number = int(value)
+    if number <= 0:
+        raise ValueError("El número debe ser mayor a 0.")
+    return number
+
+
+def parse_positive_float(value: str) -> float:
+    value = parse_non_empty(value).replace(",", ".")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError("Debe ingresar un número. Ejemplo: 10.50") from None
+    # float() también acepta "nan", "inf" y exponentes que desbordan
+    if not math.isfinite(number):
+        raise ValueError("Debe ingresar un número. Ejemplo: 10.50")
+    if number <= 0:
+        raise ValueError("El número debe ser mayor a 0.")
+    return number
+
+
+ARTICLE_FIELDS: Dict[str, Callable[[str], Any]] = {
+    "nombre": parse_non_empty,
+    "categoria": parse_non_empty,
+    "cantidad": parse_positive_int,
+    "precio_unitario": parse_positive_float,
+    "descripcion": parse_non_empty,
+}
+
+
+def parse_article(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida los campos de un artículo leído de un archivo; el error nombra el campo."""
+    article = {}
+    for field, parse in ARTICLE_FIELDS.items():
+        value = row.get(field)
+        try:
+            article[field] = parse("" if value is None else str(value))
+        except ValueError as error:
+            raise ValueError(f"{field}: {error}") from None
+    return article
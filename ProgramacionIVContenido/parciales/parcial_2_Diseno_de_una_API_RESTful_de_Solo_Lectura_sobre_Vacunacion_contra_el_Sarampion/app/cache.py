@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+
+from app.data_access import RecordIndex
+from app.responses import dumps
+from app.services import ProvincialTables, normalize_province
+
+
+@dataclass(frozen=True)
+class RenderedResponse:
+    """Cuerpo JSON ya serializado de una respuesta y su ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, content: object) -> RenderedResponse:
+        body = dumps(content)
+        # ETag débil: GZipMiddleware puede cambiar los bytes enviados
+        return cls(body, f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+@dataclass(frozen=True)
+class ResponseCache:
+    """Todas las respuestas posibles de la API, serializadas de antemano.
+
+    Los datos no cambian entre recargas del archivo, así que cada respuesta
+    (todos los registros, cada año, cada provincia y año) se arma y se
+    serializa una sola vez por versión del archivo.
+    """
+
+    latest_year: int | None
+    all_records: RenderedResponse
+    by_year: dict[int, RenderedResponse]
+    by_province: dict[tuple[str, int], RenderedResponse]
+
+    @classmethod
+    def build(cls, index: RecordIndex, tables: ProvincialTables) -> ResponseCache:
+        by_province = {
+            (province, year): RenderedResponse.of([record.model_dump() for record in records])
+            for year, table in tables.items()
+            for province, records in table.items()
+        }
+        return cls(
+            latest_year=index.latest_year,
+            all_records=RenderedResponse.of([record.model_dump() for record in index.records]),
+            by_year={year: RenderedResponse.of(record.model_dump()) for year, record in index.by_year.items()},
+            by_province=by_province,
+        )
+
+    def province(self, name: str, year: int | None) -> RenderedResponse | None:
+        if year is None:
+            year = self.latest_year
+        return self.by_province.get((normalize_province(name), year))
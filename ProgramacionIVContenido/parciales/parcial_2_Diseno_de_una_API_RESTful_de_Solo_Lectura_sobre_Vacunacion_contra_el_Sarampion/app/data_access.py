@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from functools import lru_cache
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
 
@@ -11,23 +11,36 @@ from app.models import VaccinationRecord
 DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "vaccination_data.json"
 
 
-@lru_cache(maxsize=1)
-def load_records() -> tuple[VaccinationRecord, ...]:
-    """Carga y valida los registros desde el archivo JSON."""
+@dataclass(frozen=True)
+class RecordIndex:
+    """Registros indexados una sola vez para que cada consulta sea O(1)."""
 
-    with DATA_PATH.open("r", encoding="utf-8") as fp:
-        raw_records = json.load(fp)
-
-    return tuple(VaccinationRecord(**record) for record in raw_records)
+    records: tuple[VaccinationRecord, ...]
+    by_year: dict[int, VaccinationRecord]
+    years: tuple[int, ...]
+    latest_year: int | None
 
+    @classmethod
+    def build(cls, records: Iterable[VaccinationRecord]) -> RecordIndex:
+        records = tuple(records)
+        by_year: dict[int, VaccinationRecord] = {}
+        for record in records:
+            # Si un año se repite gana el primero, como en la búsqueda lineal anterior
+            by_year.setdefault(record.year, record)
+        years = tuple(sorted(by_year))
+        return cls(records, by_year, years, years[-1] if years else None)
 
-def get_all_records() -> Iterable[VaccinationRecord]:
-    """Devuelve todos los registros disponibles."""
 
-    return load_records()
+def load_records(path: Path | None = None) -> tuple[VaccinationRecord, ...]:
+    """Carga y valida los registros desde el archivo JSON.
 
+    Lanza ValueError (JSON inválido o registros que no cumplen el modelo) u
+    OSError si no se puede leer el archivo.
+    """
 
-def get_record_by_year(year: int) -> VaccinationRecord | None:
-    """Busca un registro por año."""
+    with (path or DATA_PATH).open("r", encoding="utf-8") as fp:
+        raw_records = json.load(fp)
 
-    return next((record for record in load_records() if record.year == year), None)
+    if not isinstance(raw_records, list):
+        raise ValueError("El archivo de datos debe contener una lista de registros")
+    return tuple(VaccinationRecord.model_validate(record) for record in raw_records)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+if TYPE_CHECKING:
+    from app.cache import RenderedResponse
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional: sin ella se usa el codificador estándar
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa `content` a JSON compacto en UTF-8."""
+
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CompactJSONResponse(JSONResponse):
+    """Respuesta JSON compacta, serializada con orjson cuando está instalado."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): se ignora el prefijo W/."""
+
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def rendered_response(request: Request, rendered: RenderedResponse) -> Response:
+    """Sirve bytes ya serializados, o 304 si el cliente tiene la misma versión."""
+
+    headers = {"ETag": rendered.etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(rendered.body, media_type="application/json", headers=headers)
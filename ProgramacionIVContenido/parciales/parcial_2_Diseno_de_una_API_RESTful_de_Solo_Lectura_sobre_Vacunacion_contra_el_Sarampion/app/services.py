@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import unicodedata
 from typing import Iterable
 
-from app.data_access import get_record_by_year
+from app.data_access import RecordIndex
 from app.models import ProvincialCoverage
 
+ProvincialTables = dict[int, dict[str, tuple[ProvincialCoverage, ...]]]
+
 _PROVINCES = (
     "Bocas del Toro",
     "Coclé",
@@ -19,14 +22,14 @@ _PROVINCES = (
 )
 
 
-def simulate_provincial_data(year: int) -> Iterable[ProvincialCoverage]:
+def simulate_provincial_data(index: RecordIndex, year: int) -> Iterable[ProvincialCoverage]:
     """Genera datos simulados por provincia a partir de la cobertura nacional.
 
     Se aplica un ligero ajuste porcentual para cada provincia con el fin de ofrecer
     diversidad en los resultados manteniendo coherencia con el valor nacional.
     """
 
-    base_record = get_record_by_year(year)
+    base_record = index.by_year.get(year)
     if not base_record:
         return ()
 
@@ -45,3 +48,21 @@ def simulate_provincial_data(year: int) -> Iterable[ProvincialCoverage]:
         )
 
     return tuple(simulated)
+
+
+def normalize_province(name: str) -> str:
+    """Clave de búsqueda de una provincia: sin distinguir mayúsculas ni la forma Unicode de los acentos."""
+
+    return unicodedata.normalize("NFC", name).casefold()
+
+
+def build_provincial_tables(index: RecordIndex) -> ProvincialTables:
+    """Datos simulados de todas las provincias para cada año de `index`, por nombre normalizado."""
+
+    tables: ProvincialTables = {}
+    for year in index.years:
+        table: dict[str, list[ProvincialCoverage]] = {}
+        for record in simulate_provincial_data(index, year):
+            table.setdefault(normalize_province(record.province), []).append(record)
+        tables[year] = {key: tuple(records) for key, records in table.items()}
+    return tables
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from app import data_access
+from app.cache import ResponseCache
+from app.data_access import RecordIndex
+from app.services import ProvincialTables, build_provincial_tables
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre cada revisión del archivo de datos; 0 desactiva la recarga en caliente
+RELOAD_INTERVAL = float(os.environ.get("VACUNAS_RELOAD_INTERVAL", "2"))
+
+
+def _signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Una versión del archivo de datos junto con todo lo que se deriva de ella.
+
+    Índice, tablas provinciales y respuestas serializadas se arman juntos y se
+    publican reemplazando una sola referencia, así que una petición que tomó
+    una versión la usa completa hasta terminar aunque entre tanto se cargue
+    otra.
+    """
+
+    signature: tuple[int, int]
+    index: RecordIndex
+    provincial_tables: ProvincialTables
+    responses: ResponseCache
+
+    @classmethod
+    def load(cls, path: Path) -> DataSnapshot:
+        # La firma se toma antes de leer: si el archivo cambia mientras tanto,
+        # la próxima revisión lo vuelve a cargar
+        signature = _signature(path)
+        index = RecordIndex.build(data_access.load_records(path))
+        tables = build_provincial_tables(index)
+        return cls(signature, index, tables, ResponseCache.build(index, tables))
+
+
+_current: DataSnapshot | None = None
+# Firma de la última versión que no se pudo cargar, para no reintentarla en cada revisión
+_rejected: tuple[int, int] | None = None
+_lock = threading.Lock()
+
+
+def current_snapshot() -> DataSnapshot:
+    """Versión publicada de los datos; la primera vez se carga en el momento."""
+
+    global _current
+    snapshot = _current
+    if snapshot is None:
+        with _lock:
+            if _current is None:
+                _current = DataSnapshot.load(data_access.DATA_PATH)
+            snapshot = _current
+    return snapshot
+
+
+def reload_if_changed() -> bool:
+    """Carga y publica el archivo si cambió desde la versión actual.
+
+    Si el archivo nuevo no se puede leer o no es válido se conserva la versión
+    anterior. Devuelve True solo si se publicó una versión nueva.
+    """
+
+    global _current, _rejected
+    path = data_access.DATA_PATH
+    try:
+        signature = _signature(path)
+    except OSError as error:
+        logger.warning("No se pudo revisar %s: %s", path, error)
+        return False
+    if signature in (current_snapshot().signature, _rejected):
+        return False
+
+    with _lock:
+        if _current is not None and _current.signature == signature:
+            return False
+        try:
+            snapshot = DataSnapshot.load(path)
+        except (OSError, ValueError) as error:
+            _rejected = signature
+            logger.warning("Se mantiene la versión anterior; %s no es válido: %s", path, error)
+            return False
+        _current = snapshot
+    logger.info("Datos recargados desde %s (%d registros)", path, len(snapshot.index.records))
+    return True
+
+
+class DataWatcher:
+    """Hilo que revisa el mtime del archivo de datos y lo recarga en segundo plano."""
+
+    def __init__(self, interval: float = RELOAD_INTERVAL) -> None:
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vacunas-data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                reload_if_changed()
+            except Exception:
+                # Un error inesperado no debe detener las revisiones siguientes
+                logger.exception("Falló la recarga de los datos de vacunación")
@@ -1,10 +1,29 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
 
-from app.data_access import get_all_records, get_record_by_year
 from app.models import ProvincialCoverage, VaccinationRecord
-from app.services import simulate_provincial_data
+from app.responses import CompactJSONResponse, rendered_response
+from app.snapshot import DataWatcher, current_snapshot
+
+RECORD_FIELDS = tuple(VaccinationRecord.model_fields)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Índices, tablas provinciales y respuestas se arman al arrancar, no en la
+    # primera consulta; después un hilo recarga el archivo cuando cambia
+    current_snapshot()
+    watcher = DataWatcher()
+    watcher.start()
+    try:
+        yield
+    finally:
+        watcher.stop()
+
 
 app = FastAPI(
     title="Cobertura de vacunación contra el sarampión en Panamá",
@@ -13,25 +32,56 @@ app = FastAPI(
         "Mundial para Panamá."
     ),
     version="1.0.0",
+    default_response_class=CompactJSONResponse,
+    lifespan=lifespan,
 )
+# Comprime con gzip las respuestas de 500 bytes o más si el cliente lo acepta
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+
+def parse_fields(raw: str) -> tuple[str, ...]:
+    """Convierte "year,coverage" en la tupla de campos pedidos, validando cada nombre."""
+
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in RECORD_FIELDS]
+    if not fields or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El parámetro fields solo admite: {', '.join(RECORD_FIELDS)}",
+        )
+    return fields
 
 
 @app.get("/vacunas", response_model=list[VaccinationRecord], tags=["Vacunas"])
-def read_all_vaccines() -> list[VaccinationRecord]:
-    """Devuelve todos los registros disponibles."""
+def read_all_vaccines(
+    request: Request,
+    fields: str | None = Query(
+        default=None,
+        description="Campos a devolver separados por coma, por ejemplo `year,coverage`.",
+    ),
+):
+    """Devuelve todos los registros disponibles, o solo los campos indicados en `fields`."""
 
-    return list(get_all_records())
+    snapshot = current_snapshot()
+    if fields is None:
+        return rendered_response(request, snapshot.responses.all_records)
+
+    selected = parse_fields(fields)
+    # Un subconjunto de campos no cumple el modelo completo: se responde directamente
+    return CompactJSONResponse(
+        [{name: getattr(record, name) for name in selected} for record in snapshot.index.records]
+    )
 
 
 @app.get("/vacunas/{year}", response_model=VaccinationRecord, tags=["Vacunas"])
-def read_vaccine_by_year(year: int) -> VaccinationRecord:
+def read_vaccine_by_year(request: Request, year: int):
     """Devuelve el registro para un año específico."""
 
-    record = get_record_by_year(year)
-    if record is None:
+    rendered = current_snapshot().responses.by_year.get(year)
+    if rendered is None:
         raise HTTPException(status_code=404, detail="No se encontró el año solicitado")
 
-    return record
+    return rendered_response(request, rendered)
 
 
 @app.get(
@@ -40,24 +90,21 @@ def read_vaccine_by_year(year: int) -> VaccinationRecord:
     tags=["Vacunas"],
 )
 def read_provincial_data(
+    request: Request,
     province: str,
     year: int | None = Query(
         default=None,
         description="Año a consultar. Si no se especifica se usa el más reciente disponible.",
     ),
-) -> list[ProvincialCoverage]:
+):
     """Devuelve los datos simulados para una provincia específica."""
 
-    records = list(get_all_records())
-    if not records:
+    responses = current_snapshot().responses
+    if responses.latest_year is None:
         raise HTTPException(status_code=503, detail="No hay datos disponibles")
 
-    selected_year = year if year is not None else max(record.year for record in records)
-
-    simulated = simulate_provincial_data(selected_year)
-
-    filtered = [record for record in simulated if record.province.lower() == province.lower()]
-    if not filtered:
+    rendered = responses.province(province, year)
+    if rendered is None:
         raise HTTPException(status_code=404, detail="Provincia no encontrada o sin datos")
 
-    return filtered
+    return rendered_response(request, rendered)
@@ -1,5 +1,14 @@
+import json
+import os
+import time
+from urllib.parse import quote
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app import data_access, snapshot
+from app.data_access import RecordIndex
+from app.models import VaccinationRecord
 from main import app
 
 client = TestClient(app)
@@ -44,3 +53,123 @@ def test_get_provincial_data_by_year():
 def test_get_provincial_data_not_found():
     response = client.get("/vacunas/provincia/Atlantida")
     assert response.status_code == 404
+
+
+def test_get_all_vaccines_with_sparse_fields():
+    response = client.get("/vacunas?fields=year,coverage")
+    assert response.status_code == 200
+    payload = response.json()
+    assert len(payload) == len(client.get("/vacunas").json())
+    assert all(set(entry.keys()) == {"year", "coverage"} for entry in payload)
+
+
+def test_get_all_vaccines_rejects_unknown_fields():
+    response = client.get("/vacunas?fields=year,provincia")
+    assert response.status_code == 400
+
+
+def test_get_all_vaccines_is_gzip_compressed():
+    response = client.get("/vacunas", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()[0]["year"]
+
+
+def test_get_provincial_data_ignores_case_and_accent_encoding():
+    expected = client.get("/vacunas/provincia/Panamá").json()
+    decomposed = quote("PANAMA\u0301")
+    response = client.get(f"/vacunas/provincia/{decomposed}")
+    assert response.status_code == 200
+    assert response.json() == expected
+    assert [entry["province"] for entry in expected] == ["Panamá"]
+
+
+def test_record_index_keeps_first_record_per_year():
+    records = [
+        VaccinationRecord(year=2001, country="Panama", indicator="SH.IMM.MEAS", coverage=90.0),
+        VaccinationRecord(year=2000, country="Panama", indicator="SH.IMM.MEAS", coverage=80.0),
+        VaccinationRecord(year=2001, country="Panama", indicator="SH.IMM.MEAS", coverage=10.0),
+    ]
+    index = RecordIndex.build(records)
+    assert index.by_year[2001].coverage == 90.0
+    assert index.years == (2000, 2001)
+    assert index.latest_year == 2001
+    assert RecordIndex.build([]).latest_year is None
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = tmp_path / "vaccination_data.json"
+    path.write_bytes(data_access.DATA_PATH.read_bytes())
+    monkeypatch.setattr(data_access, "DATA_PATH", path)
+    monkeypatch.setattr(snapshot, "_current", None)
+    monkeypatch.setattr(snapshot, "_rejected", None)
+    return path
+
+
+def rewrite(path, content):
+    stat = path.stat()
+    path.write_text(content, encoding="utf-8")
+    # Garantiza un mtime distinto aunque el sistema de archivos tenga poca resolución
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def with_coverage(path, year, coverage):
+    records = json.loads(path.read_text(encoding="utf-8"))
+    for record in records:
+        if record["year"] == year:
+            record["coverage"] = coverage
+    return json.dumps(records)
+
+
+def test_get_vaccine_by_year_honors_if_none_match():
+    response = client.get("/vacunas/2005")
+    etag = response.headers["etag"]
+    cached = client.get("/vacunas/2005", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert client.get("/vacunas/2006", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_responses_reload_when_data_file_changes(data_file):
+    before = client.get("/vacunas/2005")
+    rewrite(data_file, with_coverage(data_file, 2005, 50.0))
+    assert client.get("/vacunas/2005").content == before.content
+
+    assert snapshot.reload_if_changed()
+    after = client.get("/vacunas/2005")
+    assert after.json()["coverage"] == 50.0
+    assert after.headers["etag"] != before.headers["etag"]
+    assert client.get("/vacunas?fields=year,coverage").json()[5]["coverage"] == 50.0
+
+
+def test_invalid_data_file_keeps_previous_snapshot(data_file):
+    before = client.get("/vacunas").content
+    rewrite(data_file, '[{"year": 2000, "country": "Panama"')
+    assert not snapshot.reload_if_changed()
+    rewrite(data_file, '[{"year": "dos mil"}]')
+    assert not snapshot.reload_if_changed()
+    assert client.get("/vacunas").content == before
+
+
+def test_in_flight_snapshot_is_not_modified_by_reload(data_file):
+    in_flight = snapshot.current_snapshot()
+    rewrite(data_file, with_coverage(data_file, 2005, 50.0))
+    assert snapshot.reload_if_changed()
+    assert snapshot.current_snapshot() is not in_flight
+    assert in_flight.index.by_year[2005].coverage != 50.0
+    assert in_flight.responses.province("Panamá", 2005) is not None
+
+
+def test_watcher_reloads_in_background(data_file):
+    snapshot.current_snapshot()
+    watcher = snapshot.DataWatcher(interval=0.01)
+    watcher.start()
+    try:
+        rewrite(data_file, with_coverage(data_file, 2005, 50.0))
+        deadline = time.monotonic() + 5
+        while client.get("/vacunas/2005").json()["coverage"] != 50.0:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
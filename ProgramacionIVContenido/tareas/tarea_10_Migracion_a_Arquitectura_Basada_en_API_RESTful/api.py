@@ -5,18 +5,30 @@ consuma los datos a través de HTTP. Utiliza almacenamiento en memoria
 con datos de ejemplo para simplificar las pruebas locales.
 """
 
+import os
 from itertools import count
 from typing import Dict, List, Optional
 
 from flask import Flask, jsonify, request
 
+from metrics import Metrics
+from responses import Compress, JSONProvider, parse_fields, select_fields
+
 app = Flask(__name__)
+# JSON compacto (orjson si está instalado) y compresión gzip/brotli desde 500 bytes
+app.json = JSONProvider(app)
+# Métricas en GET /metrics; METRICS_SLOW_REQUEST_MS registra las solicitudes lentas
+_slow_request_ms = os.getenv("METRICS_SLOW_REQUEST_MS")
+metrics = Metrics(app, slow_request_ms=float(_slow_request_ms) if _slow_request_ms else None)
+Compress(app, minimum_size=500)
 
 _id_generator = count(1)
 
 
 Book = Dict[str, object]
 
+BOOK_FIELDS = ("id", "title", "author", "year", "genre")
+
 
 def _next_id() -> int:
     return next(_id_generator)
@@ -73,7 +85,15 @@ def _validate_payload(data: Dict[str, object]) -> Dict[str, object]:
 
 @app.route("/books", methods=["GET"])
 def list_books():
-    return jsonify(books), 200
+    # ?fields=id,title devuelve solo esos campos de cada libro
+    raw_fields = request.args.get("fields")
+    if raw_fields is None:
+        return jsonify(books), 200
+    try:
+        fields = parse_fields(raw_fields, BOOK_FIELDS)
+    except ValueError:
+        return jsonify({"errors": [f"El parámetro fields solo admite: {', '.join(BOOK_FIELDS)}."]}), 400
+    return jsonify(select_fields(books, fields)), 200
 
 
 @app.route("/books/<int:book_id>", methods=["GET"])
@@ -0,0 +1,125 @@
+"""Compact, compressed JSON responses for Flask apps.
+
+- dumps() / JSONProvider: compact JSON through orjson when it is installed,
+  the standard library otherwise (same output, just slower).
+- Compress: after_request hook that gzip/brotli-encodes bodies of at least
+  `minimum_size` bytes when the client accepts it. Brotli needs the optional
+  `brotli` package; without it only gzip is offered.
+- parse_fields() / select_fields(): `?fields=id,name` sparse fieldsets.
+
+This file is self-contained (only Flask) and the same copy is used by
+several apps of the repository.
+"""
+import gzip
+import json
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency, the stdlib encoder is the fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional dependency, only needed for Content-Encoding: br
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def dumps(obj, default=DefaultJSONProvider.default):
+    """Serialize `obj` to compact UTF-8 JSON bytes.
+
+    Types neither encoder knows (e.g. Decimal, UUID) and dates go through
+    `default`, Flask's conversion unless told otherwise, so both encoders
+    give the same output.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            # What orjson still rejects (e.g. non-string keys) takes the slow path
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default).encode('utf-8')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider (jsonify, app.json) that never pretty-prints and uses dumps()."""
+
+    compact = True
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, self.default).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, self.default), mimetype=self.mimetype)
+
+
+class Compress:
+    def __init__(self, app=None, minimum_size=500, level=6):
+        self.minimum_size = minimum_size
+        self.level = level
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.compress)
+
+    def _encoding(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, response):
+        if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+                or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = self._encoding()
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.minimum_size:
+            return response
+
+        if encoding == 'br':
+            response.set_data(brotli.compress(body, quality=min(self.level, 11)))
+        else:
+            response.set_data(gzip.compress(body, compresslevel=self.level, mtime=0))
+        response.headers['Content-Encoding'] = encoding
+        # Compressed bytes differ from the identity ones, so the validator is
+        # only weakly equal to the original
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def parse_fields(raw, allowed):
+    """Turn "id,name" into a tuple of field names; raises ValueError on unknown ones."""
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not fields:
+        raise ValueError('Fields must list at least one field')
+    return fields
+
+
+def select_fields(items, fields):
+    """Keep only `fields` of every dict in `items` (all of them if `fields` is None)."""
+    if fields is None:
+        return items
+    return [{name: item[name] for name in fields if name in item} for item in items]
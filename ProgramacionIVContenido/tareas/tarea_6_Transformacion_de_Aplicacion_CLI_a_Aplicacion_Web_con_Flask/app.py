@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from flask import Flask, flash, redirect, render_template, request, url_for
 from redis import Redis
 
+from metrics import Metrics
 from storage import BookRepository
 
 
@@ -13,6 +14,8 @@ def create_app(redis_client: Optional[Redis] = None) -> Flask:
 
     app = Flask(__name__)
     app.secret_key = os.getenv("SECRET_KEY", "dev-secret-key")
+    slow_request_ms = os.getenv("METRICS_SLOW_REQUEST_MS")
+    Metrics(app, slow_request_ms=float(slow_request_ms) if slow_request_ms else None)
 
     client = redis_client or Redis.from_url(
         os.getenv("KEYDB_URL", "redis://localhost:6379/0"), decode_responses=False